@@ -0,0 +1,172 @@
+"""Throughput, time-to-emit and memory of :class:`aioqzone_feed.api.FeedApi` against a mock Qzone.
+
+The mock server (see :mod:`mock_server`) runs in a child process, so the peak memory measured
+by :mod:`tracemalloc` only counts the client. Each case is run twice: once for timing, and once
+with :mod:`tracemalloc` enabled for memory.
+
+Cases:
+
+- ``count``: :meth:`~aioqzone_feed.api.FeedApi.get_feeds_by_count` from the first page.
+- ``second``: :meth:`~aioqzone_feed.api.FeedApi.get_feeds_by_second` over half of the timeline.
+- ``heartbeat``: new feeds are published, then :meth:`~aioqzone_feed.api.FeedApi.heartbeat_refresh`
+  is called with ``fetch_on_heartbeat`` enabled.
+
+Time-to-emit is measured from the start of a round to each :obj:`feed_processed` emission.
+Feeds that are got but not emitted, e.g. their detail requests failed, are reported as the
+difference between ``got`` and ``emitted``.
+
+Usage::
+
+    python benchmark/bench_api.py [--rounds 20] [--latency 0.02] [--error-rate 0.05] [count second]
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import multiprocessing
+import socket
+import time
+import tracemalloc
+import typing as t
+from dataclasses import dataclass, field
+
+from aiohttp import ClientSession
+from mock_server import FakeLogin, LocalClient, add_arguments, serve
+from yarl import URL
+
+from aioqzone_feed.api import FeedApi
+
+Case = t.Callable[[FeedApi, ClientSession, URL, argparse.Namespace], t.Awaitable[int]]
+"""A case runs one round and returns the number of feeds got."""
+
+
+@dataclass
+class Result:
+    elapsed: float = 0
+    emitted: t.List[float] = field(default_factory=list)
+    got: int = 0
+    peak: int = 0
+
+    def percentile(self, p: float) -> float:
+        if not self.emitted:
+            return float("nan")
+        lat = sorted(self.emitted)
+        return lat[min(len(lat) - 1, int(p * len(lat)))]
+
+
+async def case_count(api: FeedApi, session: ClientSession, base: URL, args):
+    api.qzone_tokens.clear()
+    return await api.get_feeds_by_count(args.count)
+
+
+async def case_second(api: FeedApi, session: ClientSession, base: URL, args):
+    api.qzone_tokens.clear()
+    return await api.get_feeds_by_second(args.feeds * 60 / 2)
+
+
+async def case_heartbeat(api: FeedApi, session: ClientSession, base: URL, args):
+    async with session.post(base.with_path("/_mock/publish"), params=dict(n=args.hb_new)) as r:
+        r.raise_for_status()
+    api.fetch_on_heartbeat = True
+    result = await api.heartbeat_refresh()
+    if isinstance(result, BaseException):
+        return 0
+    await api.ch_heartbeat_notify.wait()
+    return result
+
+
+CASES: t.Dict[str, Case] = dict(count=case_count, second=case_second, heartbeat=case_heartbeat)
+
+
+async def run_case(case: Case, session: ClientSession, base: URL, args, trace: bool) -> Result:
+    res = Result()
+    api = FeedApi(LocalClient(session, base), FakeLogin(args.uin))  # type: ignore
+    t0 = 0.0
+
+    def on_feed(bid, feed):
+        res.emitted.append(time.perf_counter() - t0)
+
+    api.feed_processed.add_impl(on_feed)
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    try:
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            res.got += await case(api, session, base, args)
+            await api.wait()
+            res.elapsed += time.perf_counter() - t0
+        if trace:
+            res.peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if trace:
+            tracemalloc.stop()
+        api.stop()
+    return res
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(session: ClientSession, base: URL, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(base.with_path("/_mock/stats")) as r:
+                return await r.json()
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def amain(args: argparse.Namespace, base: URL):
+    async with ClientSession() as session:
+        await wait_ready(session, base)
+        print(
+            f"{'case':12}{'got':>6}{'emitted':>8}{'feeds/s':>10}"
+            f"{'p50 ms':>9}{'p99 ms':>9}{'peak KiB':>10}"
+        )
+        for name in args.cases:
+            timing = await run_case(CASES[name], session, base, args, trace=False)
+            memory = await run_case(CASES[name], session, base, args, trace=True)
+            n = len(timing.emitted)
+            print(
+                f"{name:12}{timing.got:6d}{n:8d}{n / timing.elapsed:10.1f}"
+                f"{timing.percentile(0.5) * 1e3:9.2f}{timing.percentile(0.99) * 1e3:9.2f}"
+                f"{memory.peak / 1024:10.1f}"
+            )
+        stats = await wait_ready(session, base)
+        print("requests:", dict(stats["requests"]), "errors:", dict(stats["errors"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help=f"cases to run, defaults to {' '.join(CASES)}")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds of each case")
+    parser.add_argument("--count", type=int, default=10, help="count of the `count` case")
+    parser.add_argument("--hb-new", type=int, default=5, help="new feeds before each heartbeat")
+    parser.add_argument("--uin", type=int, default=12345)
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    args.cases = args.cases or list(CASES)
+    if unknown := set(args.cases) - CASES.keys():
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(args, "127.0.0.1", port), daemon=True)
+    server.start()
+    try:
+        asyncio.run(amain(args, URL(f"http://127.0.0.1:{port}")))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
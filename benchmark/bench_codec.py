@@ -0,0 +1,103 @@
+"""Size and speed of :mod:`aioqzone_feed.codec` against :func:`dataclasses.asdict` + json.
+
+The naive way has no type tags, so its loader rebuilds the models by guessing: entity types
+are told by their keys with a pydantic union, and a dict ``forward`` is taken as a
+:class:`.FeedContent`. Both loaders rebuild the same models, so their decode times compare.
+
+Usage::
+
+    python benchmark/bench_codec.py [-n 2000] [--media 3]
+"""
+
+import argparse
+import json
+import timeit
+import typing as t
+from dataclasses import asdict
+
+from aioqzone.model.protocol import AtEntity, EmEntity, LinkEntity, TextEntity
+from aioqzone.utils.entity import split_entities
+from pydantic import TypeAdapter
+
+from aioqzone_feed.codec import from_bytes_batch, to_bytes_batch
+from aioqzone_feed.type import FeedContent, VisualMedia
+
+_entity = TypeAdapter(t.Union[TextEntity, AtEntity, EmEntity, LinkEntity])
+SUMMARY = "hello @{uin:10001,nick:bob} [em]e100[/em] see {url:https://example.com,text:link} " * 3
+
+
+def build(i: int, n_media: int) -> FeedContent:
+    feed = FeedContent(
+        appid=311,
+        typeid=0,
+        fid=f"{i:024x}",
+        abstime=1700000000 + i,
+        uin=10000 + i % 500,
+        nickname="nickname",
+        curkey=f"http://user.qzone.qq.com/{i}/mood/{i:024x}",
+        unikey=f"http://user.qzone.qq.com/{i}/mood/{i:024x}",
+        entities=split_entities(SUMMARY),
+        media=[
+            VisualMedia(
+                height=1080,
+                width=1920,
+                raw=f"http://photo.qzone.qq.com/{i}/{j}.jpg",
+                is_video=False,
+                thumbnail=f"http://photo.qzone.qq.com/{i}/{j}_s.jpg",
+            )
+            for j in range(n_media)
+        ],
+    )
+    if i % 3 == 0:
+        feed.forward = build(i + 1, n_media) if i % 2 else f"http://user.qzone.qq.com/{i}/share"
+    return feed
+
+
+def naive_dumps(feeds):
+    return json.dumps(
+        [asdict(f) for f in feeds], default=lambda o: o.model_dump(mode="json")
+    ).encode()
+
+
+def naive_build(d: dict) -> FeedContent:
+    fwd = d["forward"]
+    return FeedContent(
+        **{
+            **d,
+            "entities": [_entity.validate_python(e) for e in d["entities"]],
+            "forward": naive_build(fwd) if isinstance(fwd, dict) else fwd,
+            "media": [VisualMedia(**m) for m in d["media"]],
+        }
+    )
+
+
+def naive_loads(data: bytes):
+    return [naive_build(d) for d in json.loads(data)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="number of feeds")
+    parser.add_argument("--media", type=int, default=3, help="number of media per feed")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    feeds = [build(i, args.media) for i in range(args.n)]
+    assert from_bytes_batch(to_bytes_batch(feeds)) == feeds
+    assert naive_loads(naive_dumps(feeds)) == feeds
+
+    cases = {
+        "asdict + json": (naive_dumps, naive_loads),
+        "codec (batch)": (to_bytes_batch, from_bytes_batch),
+    }
+    print(f"{'':16}{'bytes/feed':>12}{'enc us/feed':>13}{'dec us/feed':>13}")
+    for name, (dumps, loads) in cases.items():
+        data = dumps(feeds)
+        enc = min(timeit.repeat(lambda: dumps(feeds), number=1, repeat=args.repeat))
+        dec = min(timeit.repeat(lambda: loads(data), number=1, repeat=args.repeat))
+        n = args.n
+        print(f"{name:16}{len(data) / n:12.0f}{enc / n * 1e6:13.2f}{dec / n * 1e6:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Per-feed cost of converting raw ``vFeeds`` items into :class:`.FeedContent`.
+
+- ``model``: validate into :class:`FeedData`, then :meth:`.FeedContent.from_feed` and
+  :meth:`.FeedContent.set_detail`, i.e. what the api does.
+- ``model (convert only)``: the conversion of already validated models.
+- ``raw``: :meth:`.FeedContent.from_raw`.
+
+Usage::
+
+    python benchmark/bench_convert.py [-n 2000] [--pics 3]
+"""
+
+import argparse
+import timeit
+
+from aioqzone.model import FeedData, ProfileFeedData
+from mock_server import as_profile_feed, synthetic_feed
+
+from aioqzone_feed.type import FeedContent
+
+
+def from_model(model):
+    feed = FeedContent.from_feed(model)
+    feed.set_detail(model)
+    return feed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="number of feeds")
+    parser.add_argument("--pics", type=int, default=3, help="number of pictures per feed")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    n = args.n
+    raws = [
+        synthetic_feed(i, 1700000000 - i * 60, 10000 + i % 50, hasmore=False, n_pics=args.pics)
+        for i in range(n)
+    ]
+
+    print(f"{'':24}{'active us/feed':>16}{'profile us/feed':>17}")
+    rows = {}
+    for profile, model_cls in ((False, FeedData), (True, ProfileFeedData)):
+        data = [as_profile_feed(i) for i in raws] if profile else raws
+        models = [model_cls.model_validate(i) for i in data]
+        assert [FeedContent.from_raw(i, profile) for i in data] == [from_model(i) for i in models]
+
+        cases = {
+            "model": lambda: [from_model(model_cls.model_validate(i)) for i in data],
+            "model (convert only)": lambda: [from_model(i) for i in models],
+            "raw": lambda: [FeedContent.from_raw(i, profile) for i in data],
+        }
+        for name, func in cases.items():
+            cost = min(timeit.repeat(func, number=1, repeat=args.repeat)) / n * 1e6
+            rows.setdefault(name, []).append(cost)
+
+    for name, (active, profile) in rows.items():
+        print(f"{name:24}{active:16.2f}{profile:17.2f}")
+
+
+if __name__ == "__main__":
+    main()
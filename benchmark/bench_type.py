@@ -0,0 +1,82 @@
+"""Memory and construction time of feed models.
+
+Compares the models in :mod:`aioqzone_feed.type` with equivalent plain dataclasses, which are
+how these models were defined before they had ``__slots__``.
+
+Usage::
+
+    python benchmark/bench_type.py [-n 20000] [--media 3]
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from aioqzone_feed.type import FeedContent, VisualMedia
+
+
+def unslotted(cls):
+    """Build a plain dataclass with the same fields as `cls`."""
+    return make_dataclass(
+        f"Plain{cls.__name__}", [(f.name, f.type, f) for f in fields(cls)], eq=True
+    )
+
+
+def build(feed_cls, media_cls, i: int, n_media: int):
+    return feed_cls(
+        appid=311,
+        typeid=0,
+        fid=f"{i:024x}",
+        abstime=1700000000 + i,
+        uin=10000 + i % 500,
+        nickname="nickname",
+        curkey=f"http://user.qzone.qq.com/{i}/mood/{i:024x}",
+        unikey=f"http://user.qzone.qq.com/{i}/mood/{i:024x}",
+        media=[
+            media_cls(
+                height=1080,
+                width=1920,
+                raw=f"http://photo.qzone.qq.com/{i}/{j}.jpg",
+                is_video=False,
+                thumbnail=f"http://photo.qzone.qq.com/{i}/{j}_s.jpg",
+            )
+            for j in range(n_media)
+        ],
+    )
+
+
+def measure(feed_cls, media_cls, n: int, n_media: int):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    feeds = [build(feed_cls, media_cls, i, n_media) for i in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del feeds
+
+    sec = min(
+        timeit.repeat(lambda: build(feed_cls, media_cls, 0, n_media), number=n // 10, repeat=3)
+    )
+    return used / n, sec / (n // 10) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="number of feeds")
+    parser.add_argument("--media", type=int, default=3, help="number of media per feed")
+    args = parser.parse_args()
+
+    cases = {
+        "plain dataclass": (unslotted(FeedContent), unslotted(VisualMedia)),
+        "slotted (current)": (FeedContent, VisualMedia),
+    }
+    print(f"{'':20}{'bytes/feed':>12}{'us/feed':>10}")
+    for name, (feed_cls, media_cls) in cases.items():
+        size, us = measure(feed_cls, media_cls, args.n, args.media)
+        print(f"{name:20}{size:12.0f}{us:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
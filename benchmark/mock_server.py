@@ -0,0 +1,362 @@
+"""A local mock of the Qzone H5 endpoints used by :class:`aioqzone_feed.api.FeedApi`.
+
+The server replays synthetic feeds, or feeds recorded from ``vFeeds`` of real responses, with
+configurable latency, error rate and page size. Requests made by a :class:`LocalClient` are
+redirected to it, so the api can be driven without login or network.
+
+It can be used in process::
+
+    async with MockQzone(n_feeds=500, page_size=10, latency=0.02) as server:
+        api = FeedApi(server.client(session), FakeLogin(12345))
+
+or standalone, so that the server does not share the memory and event loop of the client::
+
+    python benchmark/mock_server.py --port 8080 --latency 0.02
+
+Besides the Qzone endpoints, ``POST /_mock/publish?n=5`` publishes new feeds and
+``GET /_mock/stats`` returns request and error counters.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import typing as t
+from collections import Counter
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from aioqzone.api import Loginable
+from yarl import URL
+
+StrDict = t.Dict[str, t.Any]
+
+INDEX_HTML = """<html><body><script type="application/javascript">
+window.shine0callback = (function(){{ return "{token}"; }});
+var FrontPage = {{data: {data}}};
+</script></body></html>"""
+
+PROFILE_HTML = """<html><body><script type="application/javascript">
+window.shine0callback = (function(){{ return "{token}"; }});
+var FrontPage = {{ data : [{info},{feedpage}] }};
+</script></body></html>"""
+
+
+def photo_urls(uin: int, key: str) -> StrDict:
+    return {
+        str(i): dict(
+            height=h, width=w, url=f"http://photo.qzone.qq.com/{uin}/{key}_{i}.jpg", md5="", size=0
+        )
+        for i, (h, w) in enumerate([(1080, 1920), (360, 640), (180, 320)])
+    }
+
+
+def synthetic_feed(i: int, abstime: int, uin: int, *, hasmore: bool, n_pics: int) -> StrDict:
+    """Build a raw feed dict in the shape of ``vFeeds`` items."""
+    fid = f"{uin:x}{abstime:x}{i:x}".rjust(24, "0")
+    url = f"http://user.qzone.qq.com/{uin}/mood/{fid}"
+    feed: StrDict = dict(
+        id=dict(cellid=fid),
+        comm=dict(
+            time=abstime,
+            appid=311,
+            feedstype=0,
+            curlikekey=url,
+            orglikekey=url,
+            ugckey=f"{uin}_311_{fid}",
+            ugcrightkey=fid,
+            right_info=dict(ugc_right=1, allow_uins=[]),
+            wup_feeds_type=0,
+        ),
+        userinfo=dict(user=dict(uin=uin, nickname=f"user{uin}")),
+        summary=dict(summary=f"feed {i} at {abstime} " * 4, hasmore=hasmore),
+        like=dict(isliked=False, num=i % 7, likemans=[]),
+        comment=dict(num=i % 5, unreadCnt=0, comments=[]),
+    )
+    if n_pics:
+        feed["pic"] = dict(
+            albumid=f"album{uin}",
+            uin=uin,
+            picdata=[
+                dict(
+                    photourl=photo_urls(uin, f"{fid}_{j}"),
+                    videodata=dict(videoid="", videourl="", coverurl={}, videotime=0, videotype=0),
+                    albumid=f"album{uin}",
+                    curlikekey=f"{url}/{j}",
+                    origin_size=1 << 20,
+                    origin_height=1080,
+                    origin_width=1920,
+                )
+                for j in range(n_pics)
+            ],
+        )
+    return feed
+
+
+def as_profile_feed(feed: StrDict) -> StrDict:
+    """Convert an active feed dict into the ``/get_feeds`` shape, which wraps pictures differently."""
+    feed = dict(feed)
+    if pic := feed.get("pic"):
+        feed["pic"] = dict(
+            albumid=pic["albumid"],
+            uin=pic["uin"],
+            picdata=dict(
+                pic=[dict(photourl=p["photourl"], commentcount=0) for p in pic["picdata"]]
+            ),
+        )
+    return feed
+
+
+def ok(data) -> StrDict:
+    return dict(code=0, message="", data=data)
+
+
+class MockQzone:
+    """The mock server. Use it as an async context manager to start and close it."""
+
+    def __init__(
+        self,
+        *,
+        n_feeds: int = 200,
+        page_size: int = 10,
+        latency: float = 0.0,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        page_error_rate: float = 0.0,
+        hasmore_ratio: float = 0.2,
+        n_pics: int = 1,
+        interval: int = 60,
+        feeds: t.Optional[t.List[StrDict]] = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        :param n_feeds: number of synthetic feeds in the timeline.
+        :param page_size: number of feeds in a page.
+        :param latency: mean latency (seconds) of each response.
+        :param jitter: latency varies uniformly in `latency * (1 ± jitter)`.
+        :param error_rate: probability that a detail or heartbeat request returns HTTP 500.
+        :param page_error_rate: probability that a page request returns HTTP 500.
+        :param hasmore_ratio: ratio of feeds whose summary is truncated, i.e. need a detail request.
+        :param n_pics: number of pictures in each synthetic feed.
+        :param interval: seconds between two synthetic feeds.
+        :param feeds: recorded ``vFeeds`` items to replay instead of synthetic feeds, newest first.
+        :param seed: random seed.
+        """
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.page_error_rate = page_error_rate
+        self.hasmore_ratio = hasmore_ratio
+        self.n_pics = n_pics
+        self.interval = interval
+        self.rand = random.Random(seed)
+        self.active_cnt = 0
+        self.requests: t.Counter[str] = Counter()
+        self.errors: t.Counter[str] = Counter()
+
+        self._now = int(time.time())
+        self._serial = 0
+        if feeds is None:
+            self.timeline = [self._new_feed(self._now - i * interval) for i in range(n_feeds)]
+        else:
+            self.timeline = list(feeds)
+        self._index_fid()
+
+        self.app = web.Application()
+        self.app.router.add_get("/mqzone/index", self.index)
+        self.app.router.add_get("/mqzone/profile", self.profile)
+        self.app.router.add_get("/webapp/json/mqzone_feeds/getActiveFeeds", self.active_feeds)
+        self.app.router.add_get("/get_feeds", self.get_feeds)
+        self.app.router.add_get("/webapp/json/mqzone_detail/shuoshuo", self.shuoshuo)
+        self.app.router.add_get("/feeds/mfeeds_get_count", self.get_count)
+        self.app.router.add_post("/_mock/publish", self.ctl_publish)
+        self.app.router.add_get("/_mock/stats", self.ctl_stats)
+        self.server = TestServer(self.app)
+
+    async def __aenter__(self):
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.server.close()
+
+    @property
+    def base(self) -> URL:
+        return self.server.make_url("")
+
+    def client(self, session: ClientSession) -> "LocalClient":
+        """A client that sends all requests to this server."""
+        return LocalClient(session, self.base)
+
+    def _new_feed(self, abstime: int, uin: int = 10000) -> StrDict:
+        self._serial += 1
+        hasmore = self.rand.random() < self.hasmore_ratio
+        return synthetic_feed(
+            self._serial, abstime, uin + self._serial % 50, hasmore=hasmore, n_pics=self.n_pics
+        )
+
+    def _index_fid(self):
+        self._by_fid = {f["id"]["cellid"]: f for f in self.timeline}
+
+    def publish(self, n: int) -> None:
+        """Publish `n` new feeds on top of the timeline and increase ``active_cnt``."""
+        self._now += n * self.interval
+        new = [self._new_feed(self._now - i * self.interval) for i in range(n)]
+        self.timeline[:0] = new
+        self._by_fid.update((f["id"]["cellid"], f) for f in new)
+        self.active_cnt += n
+
+    async def _delay(self, kind: str, error_rate: float):
+        self.requests[kind] += 1
+        if self.latency > 0:
+            j = self.jitter
+            await asyncio.sleep(self.latency * self.rand.uniform(1 - j, 1 + j))
+        if error_rate > 0 and self.rand.random() < error_rate:
+            self.errors[kind] += 1
+            raise web.HTTPInternalServerError()
+
+    def _page(self, offset: int, hostuin: t.Optional[int] = None) -> StrDict:
+        feeds = self.timeline[offset : offset + self.page_size]
+        if hostuin:
+            feeds = [as_profile_feed(f) for f in feeds]
+        end = offset + len(feeds)
+        return dict(
+            hasmore=end < len(self.timeline),
+            attachinfo=str(end),
+            newcnt=self.active_cnt,
+            undeal_info=dict(active_cnt=self.active_cnt),
+            vFeeds=feeds,
+        )
+
+    async def index(self, request: web.Request):
+        await self._delay("index", self.page_error_rate)
+        self.active_cnt = 0
+        html = INDEX_HTML.format(token="a0b1c2", data=json.dumps(ok(self._page(0))))
+        return web.Response(text=html, content_type="text/html")
+
+    async def profile(self, request: web.Request):
+        await self._delay("profile", self.page_error_rate)
+        hostuin = int(request.query["hostuin"])
+        info = dict(
+            count=dict(blog=0, message=0, pic=0, shuoshuo=len(self.timeline)),
+            coverinfo=[dict(cover="http://qzonestyle.gtimg.cn/cover.jpg")],
+            is_friend=True,
+            is_hide=0,
+            limit=0,
+            profile=dict(
+                nickname=f"user{hostuin}", face="http://q.qlogo.cn/face.jpg", is_special=0
+            ),
+        )
+        html = PROFILE_HTML.format(
+            token="d3e4f5",
+            info=json.dumps(ok(info)),
+            feedpage=json.dumps(ok(self._page(0, hostuin))),
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def active_feeds(self, request: web.Request):
+        await self._delay("getActiveFeeds", self.page_error_rate)
+        offset = int(request.query.get("attach_info") or 0)
+        return web.json_response(ok(self._page(offset)))
+
+    async def get_feeds(self, request: web.Request):
+        await self._delay("get_feeds", self.page_error_rate)
+        offset = int(request.query.get("res_attach") or 0)
+        return web.json_response(ok(self._page(offset, int(request.query["hostuin"]))))
+
+    async def shuoshuo(self, request: web.Request):
+        await self._delay("shuoshuo", self.error_rate)
+        feed = self._by_fid.get(request.query["cellid"])
+        if feed is None:
+            return web.json_response(dict(code=-10001, message="feed not found"))
+        detail = dict(feed, hasmore=False, attach_info="")
+        detail["summary"] = dict(summary=feed["summary"]["summary"] * 8, hasmore=False)
+        return web.json_response(ok(detail))
+
+    async def get_count(self, request: web.Request):
+        await self._delay("mfeeds_get_count", self.error_rate)
+        return web.json_response(ok(dict(active_cnt=self.active_cnt)))
+
+    async def ctl_publish(self, request: web.Request):
+        self.publish(int(request.query.get("n", 1)))
+        return web.json_response(dict(active_cnt=self.active_cnt))
+
+    async def ctl_stats(self, request: web.Request):
+        return web.json_response(
+            dict(requests=self.requests, errors=self.errors, feeds=len(self.timeline))
+        )
+
+
+class LocalClient:
+    """Wraps a :class:`ClientSession` and redirects every request to `base`, keeping the path."""
+
+    def __init__(self, session: ClientSession, base: URL) -> None:
+        self.session = session
+        self.base = base
+
+    def request(self, method: str, url, **kwds):
+        return self.session.request(method, self.base.with_path(URL(url).path), **kwds)
+
+
+class FakeLogin(Loginable):
+    """A login manager with a fixed cookie."""
+
+    def __init__(self, uin: int) -> None:
+        super().__init__(uin)
+        self.cookie = dict(uin=f"o{uin}", p_skey="mock_p_skey")
+
+    async def _new_cookie(self) -> t.Dict[str, str]:
+        return self.cookie
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add arguments of :class:`MockQzone` to `parser`."""
+    parser.add_argument("--feeds", type=int, default=200, help="number of synthetic feeds")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="of detail and heartbeat")
+    parser.add_argument("--page-error-rate", type=float, default=0.0)
+    parser.add_argument("--hasmore", type=float, default=0.2, help="ratio of truncated feeds")
+    parser.add_argument("--pics", type=int, default=1, help="pictures per feed")
+    parser.add_argument("--replay", help="a json file of recorded vFeeds items, newest first")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def from_arguments(args: argparse.Namespace) -> MockQzone:
+    feeds = None
+    if args.replay:
+        with open(args.replay, encoding="utf8") as f:
+            feeds = json.load(f)
+    return MockQzone(
+        n_feeds=args.feeds,
+        page_size=args.page_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        page_error_rate=args.page_error_rate,
+        hasmore_ratio=args.hasmore,
+        n_pics=args.pics,
+        feeds=feeds,
+        seed=args.seed,
+    )
+
+
+def serve(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 8080):
+    """Run a :class:`MockQzone` built from `args` until interrupted."""
+    web.run_app(from_arguments(args).app, host=host, port=port, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+    serve(args, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
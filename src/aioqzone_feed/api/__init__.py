@@ -1,4 +1,18 @@
+from .detail import DetailCache, DetailPool
 from .feed import FeedH5Api as FeedApi
-from .heartbeat import HeartbeatApi
+from .heartbeat import HeartbeatApi, HeartbeatScheduler
+from .limit import AdaptiveLimiter
+from .pool import FeedApiPool
+from .session import CrawlReport, CrawlSession
 
-__all__ = ["FeedApi", "HeartbeatApi"]
+__all__ = [
+    "FeedApi",
+    "HeartbeatApi",
+    "HeartbeatScheduler",
+    "DetailPool",
+    "DetailCache",
+    "FeedApiPool",
+    "AdaptiveLimiter",
+    "CrawlSession",
+    "CrawlReport",
+]
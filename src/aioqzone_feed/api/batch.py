@@ -0,0 +1,193 @@
+import asyncio
+import heapq
+import typing as t
+
+T = t.TypeVar("T")
+
+__all__ = ["Batcher", "ReorderBuffer"]
+
+_EMPTY: t.Any = object()
+_SKIP: t.Any = object()
+
+
+class Batcher(t.Generic[T]):
+    """Collects items of the same batch id, and flushes them as a list once enough items are
+    collected, or a time window since the first item is passed. Items of different batch ids
+    are never flushed together.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(self, flush: t.Callable[[int, t.List[T]], t.Any]) -> None:
+        """
+        :param flush: called with `(bid, items)` on flushing.
+        """
+        self._flush = flush
+        self._bid = 0
+        self._items: t.List[T] = []
+        self._timer: t.Optional[asyncio.TimerHandle] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of items waiting to be flushed."""
+        return len(self._items)
+
+    def add(self, bid: int, item: T, max_size: int, max_delay: float) -> None:
+        """Add an item.
+
+        :param bid: batch id of the item. Collected items are flushed first if it changes.
+        :param max_size: flush if this many items are collected.
+        :param max_delay: flush if this many seconds are passed since the first item is collected.
+        """
+        if self._items and bid != self._bid:
+            self.flush()
+        self._bid = bid
+        self._items.append(item)
+        if len(self._items) >= max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(max_delay, self.flush)
+
+    def flush(self, bid: t.Optional[int] = None) -> None:
+        """Flush collected items now, if there are any.
+
+        :param bid: if given, flush only if collected items are of this batch id.
+        """
+        if bid is not None and bid != self._bid:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._items:
+            items, self._items = self._items, []
+            self._flush(self._bid, items)
+
+    def clear(self) -> None:
+        """Discard collected items without flushing."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._items = []
+
+
+class ReorderBuffer(t.Generic[T]):
+    """Emits items in the order their slots are reserved, or in the order of the keys given
+    on reserving, no matter in which order the items are filled.
+
+    A slot blocks the slots after it until it is filled. If it is not filled within :obj:`.timeout`
+    seconds after being reserved, or more than :obj:`.maxsize` slots are waiting, it is given up:
+    the slots after it are released, and its item is emitted as soon as it is filled.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(
+        self, emit: t.Callable[[T], t.Any], maxsize: int = 64, timeout: float = 5
+    ) -> None:
+        """
+        :param emit: called with each released item.
+        :param maxsize: max number of slots waiting, defaults to 64.
+        :param timeout: the head-of-line timeout in seconds, defaults to 5.
+        """
+        assert maxsize > 0
+        self._emit = emit
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.expired = 0
+        """Number of slots given up so far."""
+        self._seq = 0
+        self._heap: t.List[t.Tuple[tuple, int]] = []
+        self._slots: t.Dict[int, t.List[t.Any]] = {}
+        """seq -> [deadline, item]"""
+        self._timer: t.Optional[asyncio.TimerHandle] = None
+        self._armed: t.Optional[int] = None
+        """seq of the slot that the timer is armed for"""
+
+    @property
+    def pending(self) -> int:
+        """Number of slots waiting to be released."""
+        return len(self._slots)
+
+    def reserve(self, key: tuple = ()) -> int:
+        """Reserve a slot.
+
+        :param key: slots are released in ascending order of `(key, reserving order)`.
+            Defaults to an empty tuple, means the reserving order.
+        :return: a ticket to fill the slot.
+        """
+        seq = self._seq
+        self._seq += 1
+        loop = asyncio.get_running_loop()
+        self._slots[seq] = [loop.time() + self.timeout, _EMPTY]
+        heapq.heappush(self._heap, (key, seq))
+        if len(self._slots) > self.maxsize:
+            self._expire_head()
+        self._release()
+        return seq
+
+    def fill(self, ticket: int, item: T) -> None:
+        """Fill a slot. Items that are no longer blocked are emitted."""
+        slot = self._slots.get(ticket)
+        if slot is None:
+            # given up, emit it at once
+            self._emit(item)
+            return
+        slot[1] = item
+        self._release()
+
+    def discard(self, ticket: int) -> None:
+        """Release a slot without emitting anything."""
+        if (slot := self._slots.get(ticket)) is not None:
+            slot[1] = _SKIP
+            self._release()
+
+    def flush(self) -> None:
+        """Give up all slots that are not filled, and emit all filled items in order."""
+        while self._heap:
+            self._expire_head()
+            self._release()
+
+    def clear(self) -> None:
+        """Remove all slots without emitting."""
+        self._heap.clear()
+        self._slots.clear()
+        self._arm()
+
+    def _release(self) -> None:
+        while self._heap:
+            seq = self._heap[0][1]
+            item = self._slots[seq][1]
+            if item is _EMPTY:
+                break
+            heapq.heappop(self._heap)
+            del self._slots[seq]
+            if item is not _SKIP:
+                self._emit(item)
+        self._arm()
+
+    def _expire_head(self) -> None:
+        _, seq = self._heap[0]
+        if self._slots[seq][1] is _EMPTY:
+            heapq.heappop(self._heap)
+            del self._slots[seq]
+            self.expired += 1
+
+    def _arm(self) -> None:
+        """Arm the timer for the head slot, if the head is changed."""
+        head = self._heap[0][1] if self._heap else None
+        if head == self._armed:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._armed = head
+        if head is not None:
+            deadline = self._slots[head][0]
+            self._timer = asyncio.get_running_loop().call_at(deadline, self._on_timeout)
+
+    def _on_timeout(self) -> None:
+        self._timer = None
+        self._armed = None
+        if self._heap:
+            self._expire_head()
+            self._release()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+import typing as t
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+T = t.TypeVar("T")
+
+__all__ = ["DetailPool", "DetailCache"]
+
+DetailKey = t.Tuple[str, int, int]
+"""`(fid, uin, appid)`"""
+
+
+class DetailPool:
+    """A bounded pool for detail requests, i.e. :external+aioqzone:meth:`~aioqzone.api.h5.QzoneH5API.shuoshuo`.
+
+    At most :obj:`.max_inflight` requests are sent at the same time, and at most :obj:`.max_queue`
+    requests are waiting for a free slot. A request that cannot be queued is refused by :meth:`.submit`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(
+        self, max_inflight: int = 4, max_queue: int = 64, timeout: t.Optional[float] = 10
+    ) -> None:
+        """
+        :param max_inflight: max number of requests running at the same time, defaults to 4.
+        :param max_queue: max number of requests waiting for a free slot, defaults to 64.
+        :param timeout: timeout (seconds) of a single request, not including the time waiting
+            in the queue. Defaults to 10. ``None`` means no timeout.
+        """
+        assert max_inflight > 0
+        assert max_queue >= 0
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.pending = 0
+        """Number of requests that are running or waiting."""
+        self._sem: t.Optional[asyncio.Semaphore] = None
+
+    @property
+    def full(self) -> bool:
+        """If the pool cannot accept any more requests."""
+        return self.pending >= self.max_inflight + self.max_queue
+
+    def submit(self, func: t.Callable[[], t.Awaitable[T]]) -> t.Optional["asyncio.Future[T]"]:
+        """Schedule a request in the pool.
+
+        :param func: a function that returns the request awaitable. It is called when a slot is free.
+        :return: a future of the request result, or ``None`` if the pool is :obj:`.full`.
+            The future raises :exc:`asyncio.TimeoutError` if the request times out.
+        """
+        if self.full:
+            return None
+        self.pending += 1
+        return asyncio.ensure_future(self._run(func))
+
+    async def _run(self, func: t.Callable[[], t.Awaitable[T]]) -> T:
+        if self._sem is None:
+            # create lazily so that the semaphore is bound to the running loop
+            self._sem = asyncio.Semaphore(self.max_inflight)
+        try:
+            async with self._sem:
+                return await asyncio.wait_for(func(), self.timeout)
+        finally:
+            self.pending -= 1
+
+
+class DetailCache(t.Generic[T]):
+    """A size-bounded cache of detail responses, keyed by `(fid, uin, appid)`.
+
+    Each entry is saved with a fingerprint of the feed, e.g. its comment and like counts.
+    An entry is invalidated if it is older than :obj:`.ttl`, or if it is looked up with another
+    fingerprint. The least recently used entry is evicted if the cache is full.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600) -> None:
+        """
+        :param maxsize: max number of entries, defaults to 1024.
+        :param ttl: time to live of an entry in seconds, defaults to 600.
+        """
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[DetailKey, t.Tuple[float, t.Hashable, T]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: DetailKey, fingerprint: t.Hashable = None) -> t.Optional[T]:
+        """Get a cached response.
+
+        :param key: `(fid, uin, appid)`
+        :param fingerprint: the fingerprint of the feed now.
+        :return: the cached response, or None if it is missing or invalidated.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expire, fp, value = entry
+        if fp != fingerprint or expire < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: DetailKey, value: T, fingerprint: t.Hashable = None) -> None:
+        """Save a response.
+
+        :param key: `(fid, uin, appid)`
+        :param value: the response
+        :param fingerprint: the fingerprint of the feed when the response is got.
+        """
+        self._entries[key] = time.monotonic() + self.ttl, fingerprint, value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: DetailKey) -> None:
+        """Remove an entry if it exists."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are not reset."""
+        self._entries.clear()
@@ -2,14 +2,32 @@ import asyncio
 import logging
 import time
 import typing as t
+import weakref
+from dataclasses import fields
+from functools import partial
 
 from aioqzone.model.api.response import FeedPageResp, ProfileResp
 
+from aioqzone_feed.api.batch import Batcher, ReorderBuffer
+from aioqzone_feed.api.detail import DetailCache, DetailPool
+from aioqzone_feed.api.flight import SingleFlight
 from aioqzone_feed.api.heartbeat import HeartbeatApi
+from aioqzone_feed.api.session import CrawlReport, CrawlSession
 from aioqzone_feed.message import FeedApiEmitterMixin
-from aioqzone_feed.type import FEED_TYPES, FeedContent
+from aioqzone_feed.metrics import timed
+from aioqzone_feed.rule import DropRules
+from aioqzone_feed.store import (
+    Checkpoint,
+    CheckpointStore,
+    MemoryCheckpointStore,
+    MemorySeenStore,
+    SeenStore,
+)
+from aioqzone_feed.type import FEED_TYPES, BaseFeed, FeedContent, LazyFeedContent
 
 log = logging.getLogger(__name__)
+StopPred = t.Callable[[FEED_TYPES, int], bool]
+FilterPred = t.Callable[[FEED_TYPES], bool]
 MAX_BID = 0x7FFF
 """The max batch id.
 
@@ -24,6 +42,118 @@ class FeedH5Api(FeedApiEmitterMixin, HeartbeatApi):
 
     bid = 0
 
+    def __init__(self, *args, **kwds) -> None:
+        super().__init__(*args, **kwds)
+        self.detail_pool = DetailPool()
+        """The pool that limits detail requests of `hasmore` feeds. Replace it to change the limits.
+
+        .. versionadded:: 1.3.0
+        """
+        self.drop_rules = DropRules.default()
+        """Rules used by :meth:`.drop_rule`. Replace it with a new :class:`~aioqzone_feed.rule.DropRules`
+        to customize rules, or read its :obj:`~aioqzone_feed.rule.DropRules.hits`.
+
+        .. versionadded:: 1.3.0
+        """
+        self.detail_cache: t.Optional[DetailCache[FEED_TYPES]] = None
+        """If set, detail responses are cached, and the cached response is used if the comment
+        and like counts of the feed are not changed.
+
+        .. versionadded:: 1.3.0
+        """
+        self.fetch_on_heartbeat = False
+        """If True, a heartbeat with new feeds starts :meth:`.get_new_feeds` to get exactly
+        ``active_cnt`` feeds in a new batch. Defaults to False.
+
+        .. versionadded:: 1.3.0
+        """
+        self._hb_fetch: t.Optional[asyncio.Future] = None
+        self.lazy_detail = False
+        """If True, processed feeds are :class:`~aioqzone_feed.type.LazyFeedContent`, whose contents
+        are parsed only when they are accessed. Defaults to False.
+
+        .. versionadded:: 1.3.0
+        """
+        self.prefetch = 0
+        """Max number of pages requested ahead while the current page is being processed.
+        Defaults to 0, means the next page is requested after the current page is processed.
+
+        .. versionadded:: 1.3.0
+        """
+        self.seen_store: t.Optional[SeenStore] = None
+        """If set, feeds that have been got are remembered, and they are skipped in later crawls
+        before being dispatched. If it is None, :meth:`.get_new_feeds` keeps its watermarks and seen
+        feeds in a private :class:`.MemorySeenStore`, which other crawls do not consult.
+
+        .. versionadded:: 1.3.0
+        """
+        self.checkpoint_store: t.Optional[CheckpointStore] = None
+        """Where to save checkpoints of named crawls. A :class:`.MemoryCheckpointStore` is set if it
+        is None when a named crawl starts. Use :class:`.FileCheckpointStore` to resume after restarts.
+
+        .. versionadded:: 1.3.0
+        """
+        self.emit_batch_size = 0
+        """If > 0, processed and dropped feeds are collected and emitted in lists through
+        :obj:`.feeds_processed` and :obj:`.feeds_dropped`. A list is emitted once this many feeds
+        are collected, :obj:`.emit_batch_delay` seconds after its first feed is collected, or on
+        :meth:`.wait`. In this mode, per-feed hooks are emitted only if they are implemented.
+        Defaults to 0, means batch emission is disabled.
+
+        .. versionadded:: 1.3.0
+        """
+        self.emit_batch_delay = 1.0
+        """Max seconds that a feed waits in a batch. Defaults to 1.
+
+        .. versionadded:: 1.3.0
+        """
+        self.emit_order: t.Optional[t.Literal["page", "abstime"]] = None
+        """If set, :obj:`.feed_processed` is emitted in order, no matter which feeds wait for details.
+
+        - ``"page"``: in the order that feeds are got from pages.
+        - ``"abstime"``: newest first, i.e. in descending `(abstime, uin)` order.
+
+        Feeds are held in :obj:`~.CrawlSession.reorder` of their session until the feeds before them
+        are emitted, so a session never blocks another one. Defaults to None, means feeds are
+        emitted as soon as they are processed.
+
+        .. versionadded:: 1.3.0
+        """
+        self.reorder_timeout = 5.0
+        """The head-of-line timeout of :obj:`~.CrawlSession.reorder`, i.e. how long a slow detail
+        request can hold the feeds after it. Defaults to 5.
+
+        .. versionadded:: 1.3.0
+        """
+        self.reorder_maxsize = 64
+        """Max number of feeds waiting in :obj:`~.CrawlSession.reorder`. Defaults to 64.
+
+        .. versionadded:: 1.3.0
+        """
+        self.page_flight: SingleFlight[FeedPageResp] = SingleFlight()
+        """Coalesces identical page requests in flight, e.g. of a heartbeat fetch and a crawl
+        started by the user at the same time.
+
+        .. versionadded:: 1.3.0
+        """
+        self.detail_flight: SingleFlight[FEED_TYPES] = SingleFlight()
+        """Coalesces detail requests of the same feed in flight. A coalesced request takes no
+        slot in :obj:`.detail_pool`.
+
+        .. versionadded:: 1.3.0
+        """
+        self.deadline_margin = 0.2
+        """Seconds reserved for emission in a crawl with a deadline. Paging stops and pending detail
+        requests are given up this many seconds before the deadline, and at most half of the budget.
+        A given up request is cancelled unless another session waits on it. Defaults to 0.2.
+
+        .. versionadded:: 1.3.0
+        """
+        self._sessions: "weakref.WeakSet[CrawlSession]" = weakref.WeakSet()
+        self._new_feeds_seen = MemorySeenStore()
+        self.ch_feed_notify.on_drop = self._on_overflow
+        self._ch_feed_dispatch.on_drop = self._on_overflow
+
     def new_batch(self) -> int:
         """
         The :meth:`new_batch` function edit internal batch id and return it.
@@ -36,6 +166,39 @@ class FeedH5Api(FeedApiEmitterMixin, HeartbeatApi):
         self.bid = (self.bid + 1) % MAX_BID
         return self.bid
 
+    def _new_session(self, bid: int) -> CrawlSession:
+        session = CrawlSession(bid)
+        self._sessions.add(session)
+        return session
+
+    def _reorder(self, session: CrawlSession) -> ReorderBuffer[FeedContent]:
+        """:return: :obj:`~.CrawlSession.reorder` of the session, created if it is None."""
+        if session.reorder is None:
+            session.reorder = ReorderBuffer(
+                partial(self._emit_model, session), self.reorder_maxsize, self.reorder_timeout
+            )
+        return session.reorder
+
+    def _processed_batch(self, session: CrawlSession) -> Batcher[FeedContent]:
+        """:return: the batcher of processed feeds of the session, created if it is None."""
+        if session._processed_batch is None:
+            session._processed_batch = Batcher(
+                lambda bid, feeds: self._notify(
+                    self.feeds_processed.emit(bid, feeds), session, (bid, feeds)
+                )
+            )
+        return session._processed_batch
+
+    def _dropped_batch(self, session: CrawlSession) -> Batcher[BaseFeed]:
+        """:return: the batcher of dropped feeds of the session, created if it is None."""
+        if session._dropped_batch is None:
+            session._dropped_batch = Batcher(
+                lambda bid, feeds: self._notify(
+                    self.feeds_dropped.emit(bid, feeds), session, (bid, feeds)
+                )
+            )
+        return session._dropped_batch
+
     @t.overload
     async def get_feedpage_by_uin(
         self, uin: t.Literal[None] = None, attach_info: t.Optional[str] = None
@@ -59,57 +222,247 @@ class FeedH5Api(FeedApiEmitterMixin, HeartbeatApi):
 
     async def _get_feeds_by_pred(
         self,
-        stop_pred: t.Callable[[FEED_TYPES, int], bool],
+        stop_pred: StopPred,
         uin: t.Optional[int] = None,
-        filter_pred: t.Optional[t.Callable[[FEED_TYPES], bool]] = None,
+        filter_pred: t.Optional[FilterPred] = None,
+        throttle: t.Optional[t.Callable[[int], t.Awaitable[t.Any]]] = None,
+        checkpoint: t.Optional[str] = None,
+        session: t.Optional[CrawlSession] = None,
+        seen: t.Optional[SeenStore] = None,
     ):
         """
         :meta public:
+        :param stop_pred: stop fetching if it returns True on a feed. The feed is skipped.
+            It should not return False on feeds older than a feed it returned True on.
+        :param throttle: an async function awaited before requesting the next page.
+            It is called with the number of feeds got so far.
+        :param checkpoint: name of this crawl. If given, a :class:`~aioqzone_feed.store.Checkpoint`
+            is saved to :obj:`.checkpoint_store` after each page, and the crawl resumes from it
+            if it is interrupted and called again with the same name.
+        :param session: the session that feeds belong to. Defaults to a new session of the current
+            :obj:`.bid`. If the session has a deadline, paging stops if the next page is not
+            expected to be got in time, and the checkpoint is kept.
+        :param seen: where got feeds are remembered and skipped. Defaults to :obj:`.seen_store`.
         :return: number of feeds that we have fetched actually.
 
         :raise `tenacity.RetryError`: Exception from :meth:`.get_active_feeds`.
 
         .. note:: You may need :meth:`.new_batch` to generate a new batch id.
+
+        .. versionchanged:: 1.3.0
+
+            add `throttle`, `checkpoint` and `session` parameters. Skip feeds in :obj:`.seen_store`.
+            Support :obj:`.stop_fetch_page`.
         """
+        if session is None:
+            session = self._new_session(self.bid)
         stop_fetching = False
         attach_info = ""
         cnt_got = 0
+        if seen is None:
+            seen = self.seen_store
+        hostuin = uin or self.login.uin
+
+        if checkpoint is not None:
+            if self.checkpoint_store is None:
+                self.checkpoint_store = MemoryCheckpointStore()
+            if cp := self.checkpoint_store.get(checkpoint):
+                if cp.uin == uin:
+                    log.info("resume crawl %s from %s", checkpoint, cp)
+                    attach_info, cnt_got = cp.attach_info, cp.cnt_got
+                    if cp.qzonetoken:
+                        self.qzone_tokens.setdefault(hostuin, cp.qzonetoken)
+                else:
+                    log.warning("checkpoint %s is not for uin=%s, ignored", checkpoint, uin)
 
-        while not stop_fetching:
-            resp = await self.get_feedpage_by_uin(uin, attach_info)
-            attach_info = resp.attachinfo
-            feeds = resp.vFeeds
-            stop_fetching = not resp.hasmore
+        loop = asyncio.get_running_loop()
+        page_start = loop.time()
+        pages = self._iter_pages(uin, attach_info)
+        try:
+            async for resp in pages:
+                log.debug(resp.attachinfo, extra=dict(got=cnt_got))
 
-            log.debug(attach_info, extra=dict(got=cnt_got))
+                feeds = resp.vFeeds
+                if self.stop_fetch_page.has_impl:
+                    cuts = [i for i in await self.stop_fetch_page.results(feeds) if i is not None]
+                    if cuts:
+                        feeds = feeds[: min(cuts)]
+                        stop_fetching = True
+                per_feed_hook = self.stop_fetch.has_impl
 
-            for fd in feeds:
-                if filter_pred and filter_pred(fd):
-                    continue
-                if stop_pred(fd, cnt_got) or any(await self.stop_fetch.results(fd)):
-                    stop_fetching = True
-                    continue
-                cnt_got += 1
-                self._dispatch_feed(fd)
+                for i, fd in enumerate(feeds):
+                    if filter_pred and filter_pred(fd):
+                        continue
+                    if stop_pred(fd, cnt_got):
+                        stop_fetching = True
+                        if all(f.abstime <= fd.abstime for f in feeds[i + 1 :]):
+                            # the rest feeds are older, so they are stopped as well
+                            break
+                        continue
+                    if seen is not None and (key := (fd.userinfo.uin, fd.abstime)) in seen:
+                        continue
+                    if per_feed_hook and any(await self.stop_fetch.results(fd)):
+                        stop_fetching = True
+                        continue
+                    cnt_got += 1
+                    if seen is not None:
+                        seen.add(key)
+                    if self.ch_feed_notify.full or self._ch_feed_dispatch.full:
+                        # backpressure, if the policy is "block"
+                        await self.ch_feed_notify.wait_room()
+                        await self._ch_feed_dispatch.wait_room()
+                    self._dispatch_feed(fd, session)
 
+                if seen is not None:
+                    seen.flush()
+                if stop_fetching:
+                    break
+                # the next page is expected to take as long as this one
+                now = loop.time()
+                if resp.hasmore and session._out_of_time(now - page_start):
+                    log.info("stop paging before the deadline, got %d", cnt_got)
+                    session.cut_off = True
+                    break
+                page_start = now
+                if checkpoint is not None and resp.hasmore and resp.vFeeds:
+                    assert self.checkpoint_store
+                    cp = Checkpoint(
+                        uin=uin,
+                        attach_info=resp.attachinfo,
+                        cnt_got=cnt_got,
+                        abstime=resp.vFeeds[-1].abstime,
+                        qzonetoken=self.qzone_tokens.get(hostuin, ""),
+                    )
+                    self.checkpoint_store.put(checkpoint, cp)
+                if throttle and resp.hasmore:
+                    await throttle(cnt_got)
+        finally:
+            await pages.aclose()
+
+        if checkpoint is not None and not session.cut_off:
+            assert self.checkpoint_store
+            self.checkpoint_store.delete(checkpoint)
         return cnt_got
 
+    async def _get_page(self, uin: t.Optional[int], attach_info: str) -> FeedPageResp:
+        """:meth:`.get_feedpage_by_uin`, coalesced by :obj:`.page_flight`."""
+        key = uin or 0, attach_info
+        if (m := self.metrics) is not None and key in self.page_flight:
+            m.inc("page_coalesced")
+        return await self.page_flight.do(key, lambda: self._request_page(uin, attach_info))
+
+    async def _request_page(self, uin: t.Optional[int], attach_info: str) -> FeedPageResp:
+        """:meth:`.get_feedpage_by_uin`, limited by :obj:`.limiter` and recorded in :obj:`.metrics`
+        if they are set."""
+        if (m := self.metrics) is None:
+            return await self._limited(self.get_feedpage_by_uin, uin, attach_info)
+
+        start = time.perf_counter()
+        try:
+            resp = await self._limited(self.get_feedpage_by_uin, uin, attach_info)
+        except Exception:
+            m.inc("page_errors")
+            raise
+        m.observe("page_seconds", time.perf_counter() - start)
+        m.inc("pages")
+        return resp
+
+    async def _iter_pages(
+        self, uin: t.Optional[int] = None, attach_info: str = ""
+    ) -> t.AsyncIterator[FeedPageResp]:
+        """Iterate pages until there is no more page.
+
+        If :obj:`.prefetch` > 0, next pages are requested in background while the current page is
+        being processed. Pages requested ahead are discarded if the iterator is closed.
+        """
+        if self.prefetch <= 0:
+            while True:
+                resp = await self._get_page(uin, attach_info)
+                yield resp
+                if not resp.hasmore:
+                    return
+                attach_info = resp.attachinfo
+
+        queue: "asyncio.Queue[t.Union[FeedPageResp, BaseException]]" = asyncio.Queue()
+        slots = asyncio.Semaphore(self.prefetch)
+
+        async def fetch(attach_info: str):
+            try:
+                while True:
+                    await slots.acquire()
+                    resp = await self._get_page(uin, attach_info)
+                    queue.put_nowait(resp)
+                    if not resp.hasmore:
+                        return
+                    attach_info = resp.attachinfo
+            except Exception as e:
+                queue.put_nowait(e)
+
+        task = asyncio.ensure_future(fetch(attach_info))
+        try:
+            while True:
+                resp = await queue.get()
+                if isinstance(resp, BaseException):
+                    raise resp
+                # the page being processed takes no slot
+                slots.release()
+                yield resp
+                if not resp.hasmore:
+                    return
+        finally:
+            task.cancel()
+
+    @staticmethod
+    def _preds_by_count(count: int) -> t.Optional[t.Tuple[StopPred, t.Optional[FilterPred]]]:
+        """:return: predicates of :meth:`.get_feeds_by_count`, or None if there is nothing to get."""
+        if count <= 0:
+            return
+        count = min(count, 10)
+        return lambda _, cnt: cnt >= count, None
+
+    @staticmethod
+    def _preds_by_second(
+        seconds: float, start: t.Optional[float] = None
+    ) -> t.Optional[t.Tuple[StopPred, t.Optional[FilterPred]]]:
+        """:return: predicates of :meth:`.get_feeds_by_second`, or None if there is nothing to get."""
+        if seconds <= 0:
+            return
+
+        start = start or time.time()
+        end = start - seconds
+
+        if end > time.time():
+            return
+
+        return lambda feed, _: feed.abstime < end, lambda feed: feed.abstime > start
+
     async def get_feeds_by_count(
         self,
         count: int = 10,
         *,
         uin: t.Optional[int] = None,
+        checkpoint: t.Optional[str] = None,
+        deadline: t.Optional[float] = None,
     ) -> int:
         """Get feeds by count.
 
         :param count: feeds count to get, max as 10, defaults to 10
+        :param checkpoint: name of this crawl, used to resume it if interrupted.
+        :param deadline: total budget (seconds) of paging, detail requests and emission.
+            See :meth:`._get_feeds_until`. Use :meth:`.get_feeds_report` to know what is cut off.
 
         .. seealso:: :meth:`._get_feeds_by_pred`.
+
+        .. versionchanged:: 1.3.0
+
+            add `checkpoint` and `deadline` parameters.
         """
-        if count <= 0:
+        preds = self._preds_by_count(count)
+        if deadline is not None:
+            return (await self._get_feeds_until(deadline, preds, uin, checkpoint)).got
+        if preds is None:
             return 0
-        count = min(count, 10)
-        return await self._get_feeds_by_pred(lambda _, cnt: cnt >= count, uin)
+        return await self._get_feeds_by_pred(preds[0], uin, preds[1], checkpoint=checkpoint)
 
     async def get_feeds_by_second(
         self,
@@ -117,26 +470,360 @@ class FeedH5Api(FeedApiEmitterMixin, HeartbeatApi):
         *,
         uin: t.Optional[int] = None,
         start: t.Optional[float] = None,
+        checkpoint: t.Optional[str] = None,
+        deadline: t.Optional[float] = None,
     ) -> int:
         """Get feeds by abstime (seconds). Range: [`start` - `seconds`, `start`].
 
         :param seconds: filter on abstime, calculate from `start`.
         :param start: start timestamp, defaults to None, means now.
+        :param checkpoint: name of this crawl, used to resume it if interrupted.
+            Pass a fixed `start` as well, so that the resumed crawl has the same range.
+        :param deadline: total budget (seconds) of paging, detail requests and emission.
+            See :meth:`._get_feeds_until`. Use :meth:`.get_feeds_report` to know what is cut off.
 
         .. seealso:: :meth:`._get_feeds_by_pred`.
+
+        .. versionchanged:: 1.3.0
+
+            add `checkpoint` and `deadline` parameters.
         """
-        if seconds <= 0:
+        preds = self._preds_by_second(seconds, start)
+        if deadline is not None:
+            return (await self._get_feeds_until(deadline, preds, uin, checkpoint)).got
+        if preds is None:
             return 0
+        return await self._get_feeds_by_pred(preds[0], uin, preds[1], checkpoint=checkpoint)
 
-        start = start or time.time()
-        end = start - seconds
+    async def get_feeds_report(
+        self,
+        deadline: float,
+        *,
+        by_count: t.Optional[int] = None,
+        by_second: t.Optional[float] = None,
+        uin: t.Optional[int] = None,
+        start: t.Optional[float] = None,
+        checkpoint: t.Optional[str] = None,
+    ) -> CrawlReport:
+        """Like :meth:`.get_feeds_by_count` or :meth:`.get_feeds_by_second` with a `deadline`,
+        but return what the crawl got and what was cut off by the deadline.
 
-        if end > time.time():
-            return 0
+        .. code-block:: python
+
+            report = await api.get_feeds_report(3, by_second=86400)
+            if report.cut_off or report.summarized:
+                ...
+
+        :param deadline: total budget (seconds) of paging, detail requests and emission.
+        :param by_count: same as `count` in :meth:`.get_feeds_by_count`.
+        :param by_second: same as `seconds` in :meth:`.get_feeds_by_second`.
+
+        .. seealso:: :meth:`._get_feeds_until`.
+
+        .. versionadded:: 1.3.0
+        """
+        assert (by_count is None) != (by_second is None), "give one of by_count and by_second"
+        if by_count is not None:
+            preds = self._preds_by_count(by_count)
+        else:
+            assert by_second is not None
+            preds = self._preds_by_second(by_second, start)
+        return await self._get_feeds_until(deadline, preds, uin, checkpoint)
+
+    async def _get_feeds_until(
+        self, deadline: float, preds, uin: t.Optional[int], checkpoint: t.Optional[str]
+    ) -> CrawlReport:
+        """Crawl in a session with a total budget of `deadline` seconds, and wait until its feeds
+        are emitted or the budget is used up.
 
-        return await self._get_feeds_by_pred(
-            lambda feed, _: feed.abstime < end, uin, lambda feed: feed.abstime > start
+        :obj:`.deadline_margin` seconds before the deadline, paging stops and feeds waiting for
+        details are emitted from their summaries, and their detail requests are cancelled unless
+        other sessions wait on them. Hook emissions not finished at the deadline
+        keep running in background, and :meth:`.wait` still waits for them.
+        A checkpoint cut off by the deadline is kept, so that the crawl can be resumed.
+
+        :meta public:
+        :return: what the crawl got, and what was cut off.
+        :raise `tenacity.RetryError`: Exception from :meth:`.get_active_feeds`.
+        """
+        assert deadline > 0
+        loop = asyncio.get_running_loop()
+        session = self._new_session(self.bid)
+        if preds is None:
+            return session.report()
+
+        end = loop.time() + deadline
+        session._arm(end - min(self.deadline_margin, deadline / 2))
+        crawl = self._get_feeds_by_pred(
+            preds[0], uin, preds[1], checkpoint=checkpoint, session=session
         )
+        session.task = asyncio.ensure_future(crawl)
+        session.task.add_done_callback(session._on_done)
+        try:
+            await asyncio.wait_for(session.wait(), end - loop.time())
+        except asyncio.TimeoutError:
+            log.warning("crawl session %d is not finished before the deadline", session.bid)
+        except asyncio.CancelledError:
+            session.task.cancel()
+            raise
+        return session.report()
+
+    def _start_session(self, preds, uin: t.Optional[int], checkpoint: t.Optional[str]):
+        session = self._new_session(self.new_batch())
+
+        async def crawl():
+            if preds is None:
+                return 0
+            return await self._get_feeds_by_pred(
+                preds[0], uin, preds[1], checkpoint=checkpoint, session=session
+            )
+
+        session.task = self._ch_feed_dispatch.add_awaitable(crawl(), bounded=False)
+        session.task.add_done_callback(session._on_done)
+        return session
+
+    def start_feeds_by_count(
+        self,
+        count: int = 10,
+        *,
+        uin: t.Optional[int] = None,
+        checkpoint: t.Optional[str] = None,
+    ) -> CrawlSession:
+        """Like :meth:`.get_feeds_by_count`, but the crawl runs in background in a new
+        :class:`~aioqzone_feed.api.session.CrawlSession` with a new batch id. Many sessions can run
+        at the same time on one api.
+
+        .. code-block:: python
+
+            session = api.start_feeds_by_count(10)
+            got = await session.wait()
+
+        .. versionadded:: 1.3.0
+        """
+        return self._start_session(self._preds_by_count(count), uin, checkpoint)
+
+    def start_feeds_by_second(
+        self,
+        seconds: float,
+        *,
+        uin: t.Optional[int] = None,
+        start: t.Optional[float] = None,
+        checkpoint: t.Optional[str] = None,
+    ) -> CrawlSession:
+        """Like :meth:`.get_feeds_by_second`, but the crawl runs in background in a new
+        :class:`~aioqzone_feed.api.session.CrawlSession` with a new batch id.
+
+        .. seealso:: :meth:`.start_feeds_by_count`
+
+        .. versionadded:: 1.3.0
+        """
+        return self._start_session(self._preds_by_second(seconds, start), uin, checkpoint)
+
+    async def get_new_feeds(
+        self,
+        *,
+        uin: t.Optional[int] = None,
+        limit: t.Optional[int] = None,
+        seconds: float = 86400,
+    ) -> int:
+        """Get feeds that are newer than the watermark in :obj:`.seen_store`, i.e. the latest feed got
+        by the last call. Paging stops once a feed older than the watermark is reached. Feeds in the
+        same second as the watermark are got as well, unless they are in :obj:`.seen_store`.
+
+        The watermark is advanced unless the crawl is stopped by `limit`, so feeds that are not got
+        this time will be got next time.
+        If :obj:`.seen_store` is None, a private store of this api is used, so other crawls
+        are not affected.
+
+        :param uin: get feeds of this user, defaults to None, means active feeds.
+        :param limit: max number of feeds to get, defaults to None, means no limit.
+        :param seconds: if there is no watermark yet, get feeds in this many seconds only.
+            Defaults to one day.
+        :return: number of feeds got.
+
+        .. seealso:: :meth:`._get_feeds_by_pred`.
+
+        .. versionadded:: 1.3.0
+        """
+        return await self._get_new_feeds(uin, limit, seconds)
+
+    async def _get_new_feeds(
+        self,
+        uin: t.Optional[int],
+        limit: t.Optional[int],
+        seconds: float,
+        exact_limit: bool = False,
+        session: t.Optional[CrawlSession] = None,
+    ) -> int:
+        """
+        :param exact_limit: the `limit` is known to be the number of new feeds, so the watermark
+            is advanced even if the crawl is stopped by `limit`.
+        """
+        seen = self._new_feeds_seen if self.seen_store is None else self.seen_store
+
+        stream = uin or 0
+        watermark = seen.watermark(stream) or int(time.time() - seconds)
+        latest = watermark
+        limited = False
+
+        def stop_pred(feed: FEED_TYPES, cnt: int):
+            nonlocal latest, limited
+            # feeds in the same second as the watermark may be posted after the last crawl,
+            # the seen store skips those that have been got
+            if feed.abstime < watermark:
+                return True
+            if limit is not None and cnt >= limit:
+                limited = True
+                return True
+            latest = max(latest, feed.abstime)
+            return False
+
+        cnt = await self._get_feeds_by_pred(stop_pred, uin, session=session, seen=seen)
+        if (exact_limit or not limited) and latest > seen.watermark(stream):
+            seen.set_watermark(stream, latest)
+        return cnt
+
+    async def get_feeds_by_uins(
+        self,
+        uins: t.Iterable[int],
+        seconds: float,
+        *,
+        start: t.Optional[float] = None,
+        max_per_uin: t.Optional[int] = None,
+        max_concurrency: int = 8,
+    ) -> t.Dict[int, int]:
+        """Get feeds of many users concurrently, like calling :meth:`.get_feeds_by_second` with each
+        of the given :obj:`uins`. Feeds are emitted through :obj:`.feed_processed` and :obj:`.feed_dropped`
+        as usual, and can be told from each other by :obj:`~aioqzone_feed.type.BaseFeed.uin`.
+
+        A user that fails to be crawled is logged and skipped, it does not affect other users.
+
+        :param uins: users to crawl. Duplicated uins are crawled only once.
+        :param seconds: see :meth:`.get_feeds_by_second`.
+        :param start: see :meth:`.get_feeds_by_second`.
+        :param max_per_uin: max number of feeds to get from one user, defaults to None, means no limit.
+        :param max_concurrency: max number of users being crawled at the same time, defaults to 8.
+        :return: a dict mapping uin to the number of feeds got from this user.
+            Users that failed to be crawled are not included.
+
+        .. versionadded:: 1.3.0
+        """
+        assert max_concurrency > 0
+        if (preds := self._preds_by_second(seconds, start)) is None:
+            return {}
+
+        by_second, filter_pred = preds
+        if max_per_uin is None:
+            stop_pred = by_second
+        else:
+            stop_pred = lambda feed, cnt: cnt >= max_per_uin or by_second(feed, cnt)
+
+        sem = asyncio.Semaphore(max_concurrency)
+        session = self._new_session(self.bid)
+
+        async def crawl(uin: int):
+            async with sem:
+                return await self._get_feeds_by_pred(stop_pred, uin, filter_pred, session=session)
+
+        uins = list(dict.fromkeys(uins))
+        results = await asyncio.gather(*(crawl(uin) for uin in uins), return_exceptions=True)
+
+        counts = {}
+        for uin, r in zip(uins, results):
+            if isinstance(r, Exception):
+                log.warning("failed to get feeds of %d: %s", uin, r)
+            elif isinstance(r, BaseException):
+                raise r
+            else:
+                counts[uin] = r
+        return counts
+
+    async def iter_feeds(
+        self,
+        *,
+        by_count: t.Optional[int] = None,
+        by_second: t.Optional[float] = None,
+        uin: t.Optional[int] = None,
+        start: t.Optional[float] = None,
+        buffer: int = 10,
+    ) -> t.AsyncIterator[FeedContent]:
+        """Get feeds like :meth:`.get_feeds_by_count` or :meth:`.get_feeds_by_second`,
+        and yield processed feeds as soon as they are ready.
+
+        The next page will not be requested while there are `buffer` or more feeds that are got but
+        not taken by the consumer. So the memory is bounded even in a long crawl.
+
+        Dropped feeds are not yielded, while :obj:`.feed_dropped` is emitted as usual.
+        Emissions of this crawl are never dropped by a bounded :obj:`.ch_feed_notify`, since they are
+        bounded by `buffer` already. Feeds whose detail requests are dropped are not yielded.
+        The crawl is cancelled if the iterator is closed early, e.g. by :func:`contextlib.aclosing`.
+
+        .. code-block:: python
+
+            async for feed in api.iter_feeds(by_second=86400):
+                ...
+
+        :param by_count: same as `count` in :meth:`.get_feeds_by_count`.
+        :param by_second: same as `seconds` in :meth:`.get_feeds_by_second`.
+        :param uin: get feeds of this user, defaults to None, means active feeds.
+        :param start: see :meth:`.get_feeds_by_second`.
+        :param buffer: max number of buffered feeds before pausing, defaults to 10.
+
+        :raise `tenacity.RetryError`: Exception from :meth:`.get_active_feeds`.
+
+        .. versionadded:: 1.3.0
+        """
+        assert (by_count is None) != (by_second is None), "give one of by_count and by_second"
+        if by_count is not None:
+            preds = self._preds_by_count(by_count)
+        else:
+            assert by_second is not None
+            preds = self._preds_by_second(by_second, start)
+        if preds is None:
+            return
+
+        session = self._new_session(self.new_batch())
+        queue: "asyncio.Queue[t.Optional[FeedContent]]" = asyncio.Queue()
+        taken = 0
+        progress = asyncio.Event()
+        # the consumer bounds emissions by `buffer`, and a dropped emission of a queued feed
+        # must not be counted as lost
+        session._bounded = False
+        # feeds whose details are dropped by a bounded channel will never be taken
+        session._on_lost = progress.set
+
+        def take():
+            nonlocal taken
+            taken += 1
+            progress.set()
+
+        # feeds are got from the session itself, so feeds of other crawls are never mixed in,
+        # even if they share the batch id
+        session._on_processed = queue.put_nowait
+        session._on_dropped = lambda feed: take()
+
+        async def throttle(cnt_got: int):
+            while cnt_got - taken - session.lost >= buffer:
+                progress.clear()
+                await progress.wait()
+
+        async def crawl():
+            try:
+                await self._get_feeds_by_pred(preds[0], uin, preds[1], throttle, session=session)
+                await session.wait()
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.ensure_future(crawl())
+        try:
+            while (feed := await queue.get()) is not None:
+                yield feed
+                take()
+            await task
+        finally:
+            task.cancel()
+            if not session.done():
+                session.cancel()
 
     def drop_rule(self, feed: FEED_TYPES) -> bool:
         """Drop feeds according to some rules.
@@ -146,54 +833,342 @@ class FeedH5Api(FeedApiEmitterMixin, HeartbeatApi):
 
         :param feed: the feed
         :return: if the feed is dropped.
-        """
-        if feed.userinfo.uin == 20050606:
-            log.info(f"advertisement rule hit: {feed.userinfo.uin}")
-            log.debug(f"Dropped: {feed}")
-            return True
 
-        if feed.fid.startswith("advertisement"):
-            log.info(f"advertisement rule hit: {feed.fid}")
-            log.debug(f"Dropped: {feed}")
-            return True
+        .. versionchanged:: 1.3.0
 
-        return False
+            check feeds with :obj:`.drop_rules`.
+        """
+        if (hit := self.drop_rules.match(feed)) is None:
+            return False
+        log.debug("drop rule %s hit: %s", hit, feed.fid)
+        return True
 
-    def _dispatch_feed(self, feed: FEED_TYPES) -> None:
+    def _dispatch_feed(self, feed: FEED_TYPES, session: t.Optional[CrawlSession] = None) -> None:
         """dispatch feed according to api support.
 
         1. Drop feed according to rules defined in `drop_rule`, trigger :meth:`FeedDropped` hook if dropped;
-        2. Get more if `hasmore` flag is set to ``1`` (Not Implemented yet);
+        2. Get more through :obj:`.detail_cache` or :obj:`.detail_pool` if `hasmore` flag is set to ``1``,
+           and check the detail with `drop_rule` again;
         3. Trigger :meth:`FeedProcEnd` for prcocessed feeds.
 
+        If the detail request cannot be queued, times out or fails, or it is not done before the
+        deadline of the session, the feed is emitted from its summary.
+        If :obj:`.emit_order` is set, a slot in :obj:`~.CrawlSession.reorder` is reserved for the feed
+        before all.
+        A detail request of the same feed in flight is shared through :obj:`.detail_flight`.
+
         :param feed: feed
+        :param session: the session that the feed belongs to, defaults to a session of the current
+            :obj:`.bid`.
+
+        .. versionchanged:: 1.3.0
+
+            detail requests are limited by :obj:`.detail_pool`.
+            Feeds are dropped before getting details. Add `session` parameter.
         """
+        if session is None:
+            session = self._new_session(self.bid)
+        session.got += 1
+        if (m := self.metrics) is None:
+            dropped = self.drop_rule(feed)
+        else:
+            m.inc("feeds")
+            with m.timer("drop_rule_seconds"):
+                dropped = self.drop_rule(feed)
+
+        if dropped:
+            self._emit_dropped(feed, session)
+            return
+
+        session._enter()
+        if self.emit_order is None:
+            ticket = None
+        elif self.emit_order == "abstime":
+            ticket = self._reorder(session).reserve((-feed.abstime, -feed.userinfo.uin))
+        else:
+            ticket = self._reorder(session).reserve()
+
+        if feed.summary.hasmore and session._out_of_time(0):
+            # no time for details
+            self._emit_summary(feed, session, ticket)
+            return
+
         if feed.summary.hasmore:
-            self._ch_feed_dispatch.add_awaitable(
-                self.shuoshuo(feed.fid, feed.userinfo.uin, feed.common.appid)
-            ).add_done_callback(lambda t: self._dispatch_feed(t.result()))
+            if self.detail_cache is not None:
+                detail = self.detail_cache.get(self._detail_key(feed), self._fingerprint(feed))
+                if detail is not None:
+                    if m:
+                        m.inc("detail_cache_hits")
+                    self._emit_detail(detail, session, ticket)
+                    return
+
+            def get_detail():
+                aw = self._limited(self.shuoshuo, feed.fid, feed.userinfo.uin, feed.common.appid)
+                return aw if m is None else timed(m, "detail_seconds", aw)
+
+            key = self._detail_key(feed)
+            coalesced = key in self.detail_flight
+            fut = self.detail_flight.submit(key, lambda: self.detail_pool.submit(get_detail))
+            if m and coalesced:
+                m.inc("detail_coalesced")
+            elif m:
+                m.inc("detail_requests" if fut else "detail_refused")
+                m.set("detail_pending", self.detail_pool.pending)
+            if fut is not None:
+                # the future may be shared by other sessions, so only a wrapper of this session
+                # is dropped if the dispatch channel overflows or the deadline comes. The request
+                # is cancelled once no session waits on it.
+                self.detail_flight.join(fut)
+                waiter = self._ch_feed_dispatch.add_awaitable(
+                    asyncio.shield(fut), (session.bid, feed)
+                )
+                token = None
+                if session._cutoff is not None:
+                    token = session._hold(
+                        partial(self._give_up_detail, feed, session, ticket, waiter)
+                    )
+                waiter.add_done_callback(
+                    partial(self._on_detail, feed, session, ticket, token, fut)
+                )
+                if m:
+                    m.set("dispatch_pending", self._ch_feed_dispatch.depth)
+                return
+            log.warning("detail pool is full, emit %s from its summary", feed.fid)
+
+        self._emit_feed(feed, session, ticket)
+
+    def _on_detail(
+        self,
+        feed: FEED_TYPES,
+        session: CrawlSession,
+        ticket: t.Optional[int],
+        token: t.Optional[int],
+        request: "asyncio.Future[FEED_TYPES]",
+        fut: "asyncio.Future[FEED_TYPES]",
+    ) -> None:
+        self.detail_flight.leave(request)
+        if (m := self.metrics) is not None:
+            m.set("dispatch_pending", self._ch_feed_dispatch.depth)
+        if token is not None and not session._settle(token):
+            # emitted from its summary at the deadline
+            return
+        if fut.cancelled() or session.cancelled:
+            if not session.cancelled:
+                # dropped by the bounded dispatch channel
+                session._lose()
+            if ticket is not None:
+                self._reorder(session).discard(ticket)
+            session._leave()
             return
+        exc = fut.exception()
+        if m:
+            m.set("detail_pending", self.detail_pool.pending)
+            if exc is not None:
+                m.inc("detail_errors")
+                if isinstance(exc, asyncio.TimeoutError):
+                    m.inc("detail_timeouts")
+        if isinstance(exc, asyncio.TimeoutError):
+            log.warning("detail of %s timed out, emit it from its summary", feed.fid)
+            self._emit_feed(feed, session, ticket)
+            return
+        if exc is not None:
+            log.warning("detail of %s failed, emit it from its summary: %s", feed.fid, exc)
+            self._emit_feed(feed, session, ticket)
+            return
+
+        detail = fut.result()
+        if self.detail_cache is not None:
+            self.detail_cache.put(self._detail_key(feed), detail, self._fingerprint(feed))
+        self._emit_detail(detail, session, ticket)
+
+    def _emit_detail(
+        self, detail: FEED_TYPES, session: CrawlSession, ticket: t.Optional[int] = None
+    ) -> None:
+        """Emit a feed with its detail. The detail is checked by :meth:`.drop_rule` again, since
+        keywords may appear only in the full text."""
+        if not self.drop_rule(detail):
+            self._emit_feed(detail, session, ticket)
+            return
+        if ticket is not None:
+            self._reorder(session).discard(ticket)
+        session._leave()
+        self._emit_dropped(detail, session)
+
+    def _give_up_detail(
+        self,
+        feed: FEED_TYPES,
+        session: CrawlSession,
+        ticket: t.Optional[int],
+        waiter: asyncio.Future,
+    ) -> None:
+        """Emit a feed from its summary at the deadline, and stop waiting for its detail."""
+        self._emit_summary(feed, session, ticket)
+        waiter.cancel()
 
+    def _emit_dropped(self, feed: FEED_TYPES, session: CrawlSession) -> None:
+        """Emit :obj:`.feed_dropped` for a feed dropped by :meth:`.drop_rule`."""
+        session.dropped += 1
+        if m := self.metrics:
+            m.inc("feeds_dropped")
         model = FeedContent.from_feed(feed)
+        if session._on_dropped is not None:
+            session._on_dropped(model)
+        if self.emit_batch_size > 0:
+            self._dropped_batch(session).add(
+                session.bid, model, self.emit_batch_size, self.emit_batch_delay
+            )
+            if not self.feed_dropped.has_impl:
+                return
+        emit = self.feed_dropped.emit(session.bid, model)
+        fut = self.ch_feed_notify.add_awaitable(
+            emit, (session.bid, model), bounded=session._bounded
+        )
+        session._track(fut, 1)
+
+    def _emit_summary(
+        self, feed: FEED_TYPES, session: CrawlSession, ticket: t.Optional[int] = None
+    ) -> None:
+        """Emit a feed from its summary, since its details cannot be got before the deadline."""
+        session.summarized += 1
+        if m := self.metrics:
+            m.inc("feeds_summarized")
+        self._emit_feed(feed, session, ticket)
+
+    @staticmethod
+    def _detail_key(feed: FEED_TYPES):
+        return feed.fid, feed.userinfo.uin, feed.common.appid
+
+    @staticmethod
+    def _fingerprint(feed: FEED_TYPES):
+        return feed.comment.num, feed.like.likeNum
+
+    def _emit_feed(
+        self, feed: FEED_TYPES, session: CrawlSession, ticket: t.Optional[int] = None
+    ) -> None:
+        """Convert the feed and emit it, or fill it in :obj:`~.CrawlSession.reorder` if a ticket
+        is given."""
+        if (m := self.metrics) is None:
+            model = (LazyFeedContent if self.lazy_detail else FeedContent).from_feed(feed)
+            model.set_detail(feed)
+        else:
+            with m.timer("convert_seconds"):
+                model = (LazyFeedContent if self.lazy_detail else FeedContent).from_feed(feed)
+                model.set_detail(feed)
+
+        if ticket is None:
+            self._emit_model(session, model)
+        else:
+            self._reorder(session).fill(ticket, model)
 
-        if self.drop_rule(feed):
-            FeedContent.from_feed(feed)
-            self.ch_feed_notify.add_awaitable(self.feed_dropped.emit(self.bid, model))
+    def _emit_model(self, session: CrawlSession, model: FeedContent) -> None:
+        if session.cancelled:
             return
+        session._leave()
+        session.emitted += 1
+        if m := self.metrics:
+            m.inc("feeds_emitted")
+        if session._on_processed is not None:
+            session._on_processed(model)
+        if self.emit_batch_size > 0:
+            self._processed_batch(session).add(
+                session.bid, model, self.emit_batch_size, self.emit_batch_delay
+            )
+            if not self.feed_processed.has_impl:
+                return
+        self._notify(self.feed_processed.emit(session.bid, model), session, (session.bid, model))
 
-        model.set_detail(feed)
-        self.ch_feed_notify.add_awaitable(self.feed_processed.emit(self.bid, model))
+    def _notify(
+        self,
+        emit: t.Awaitable,
+        session: t.Optional[CrawlSession] = None,
+        tag: t.Optional[t.Tuple[int, t.Union[BaseFeed, t.List[BaseFeed]]]] = None,
+    ) -> None:
+        """Schedule a hook emission in :obj:`.ch_feed_notify`, timed if :obj:`.metrics` is set.
+
+        :param tag: `(bid, feed)` of the emission, or `(bid, feeds)` of a batch emission.
+            It is used to send notices if the emission is dropped.
+        """
+        if (m := self.metrics) is not None:
+            emit = timed(m, "hook_seconds", emit)
+        fut = self.ch_feed_notify.add_awaitable(
+            emit, tag, bounded=session is None or session._bounded
+        )
+        if session is not None:
+            if tag is None:
+                session._track(fut)
+            else:
+                session._track(fut, len(tag[1]) if isinstance(tag[1], list) else 1)
+        if m is not None:
+            m.set("notify_pending", self.ch_feed_notify.depth)
+            m.set("notify_dropped", self.ch_feed_notify.dropped)
+
+    def _on_overflow(
+        self, tag: t.Optional[t.Tuple[int, t.Union[BaseFeed, FEED_TYPES, t.List[BaseFeed]]]]
+    ) -> None:
+        """Emit :obj:`.feed_overflowed` for a feed whose emission or detail request is dropped,
+        or for each feed of a dropped batch emission."""
+        if tag is None:
+            return
+        bid, feeds = tag
+        for feed in feeds if isinstance(feeds, list) else [feeds]:
+            if isinstance(feed, BaseFeed):
+                # keep only the fields of BaseFeed, so that the contents can be released
+                feed = BaseFeed(*(getattr(feed, f.name) for f in fields(BaseFeed)))
+            else:
+                feed = BaseFeed.from_feed(feed)
+            emit = self.feed_overflowed.emit(bid, feed)
+            self.ch_feed_notify.add_awaitable(emit, bounded=False)
+
+    async def heartbeat_refresh(self) -> t.Union[int, BaseException]:
+        """Call heartbeat once. If :obj:`.fetch_on_heartbeat` is True and there are new feeds,
+        start :meth:`.get_new_feeds` with ``limit=active_cnt`` in background. Paging stops at the
+        latest feed got before, so no more pages than needed are requested. It is skipped if the
+        last one is still running.
+
+        .. seealso:: :meth:`HeartbeatApi.heartbeat_refresh`
+
+        .. versionadded:: 1.3.0
+        """
+        result = await super().heartbeat_refresh()
+        if (
+            self.fetch_on_heartbeat
+            and isinstance(result, int)
+            and result > 0
+            and (self._hb_fetch is None or self._hb_fetch.done())
+        ):
+            session = self._new_session(self.new_batch())
+            self._hb_fetch = self.ch_heartbeat_notify.add_awaitable(
+                self._fetch_new(result, session), bounded=False
+            )
+        return result
+
+    async def _fetch_new(self, cnt: int, session: CrawlSession) -> None:
+        try:
+            got = await self._get_new_feeds(None, cnt, 86400, exact_limit=True, session=session)
+            log.debug("heartbeat fetch: active_cnt=%d, got=%d", cnt, got)
+        except Exception as e:
+            log.warning("heartbeat fetch failed: %s", e)
 
     async def wait(self):
         """Wait until all feeds are dispatched and emitted.
 
         .. versionadded:: 1.2.1.dev1
+
+        .. versionchanged:: 1.3.0
+
+            flush feeds held for ordered emission and batch emission.
         """
         await asyncio.gather(self._ch_feed_dispatch.wait(), self.ch_feed_notify.wait())
+        for session in list(self._sessions):
+            if not session.cancelled:
+                session._flush()
         await self.ch_feed_notify.wait()
 
     def stop(self) -> None:
         """Clear **all** registered tasks. All tasks will be CANCELLED if not finished."""
         log.warning("FeedApi stopping...")
+        for session in list(self._sessions):
+            session.cancel()
         FeedApiEmitterMixin.stop(self)
         HeartbeatApi.stop(self)
+        self.detail_flight.clear()
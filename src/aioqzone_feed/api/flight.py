@@ -0,0 +1,85 @@
+import asyncio
+import typing as t
+from functools import partial
+
+T = t.TypeVar("T")
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight(t.Generic[T]):
+    """Coalesces identical requests in flight. While a request of a key is running, requests of the
+    same key share its future instead of being sent again. The key is forgotten once the request
+    is done, so results are never cached.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        """Number of requests that shared a request in flight."""
+        self._futs: t.Dict[t.Hashable, "asyncio.Future[T]"] = {}
+        self._waiters: t.Dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._futs)
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return key in self._futs
+
+    def submit(
+        self, key: t.Hashable, func: t.Callable[[], t.Optional["asyncio.Future[T]"]]
+    ) -> t.Optional["asyncio.Future[T]"]:
+        """Get the future in flight of `key`, or start one by `func`.
+
+        :param func: called to start the request if no request of `key` is in flight.
+            It may return None if the request cannot be started.
+        :return: the shared future, or None if `func` returns None.
+        """
+        if (fut := self._futs.get(key)) is not None:
+            self.coalesced += 1
+            return fut
+        if (fut := func()) is None:
+            return None
+        self._futs[key] = fut
+        fut.add_done_callback(partial(self._forget, key))
+        return fut
+
+    async def do(self, key: t.Hashable, func: t.Callable[[], t.Awaitable[T]]) -> T:
+        """Await the request in flight of `key`, or start one by `func` and await it.
+
+        Cancelling a caller does not affect other callers. The request is cancelled only if
+        all its callers are cancelled.
+        """
+        fut = self.submit(key, lambda: asyncio.ensure_future(func()))
+        assert fut is not None
+        self.join(fut)
+        try:
+            return await asyncio.shield(fut)
+        finally:
+            self.leave(fut)
+
+    def join(self, fut: asyncio.Future) -> None:
+        """Count a caller waiting on `fut`, a future returned by :meth:`.submit`.
+        Call :meth:`.leave` once the caller stops waiting."""
+        self._waiters[fut] = self._waiters.get(fut, 0) + 1
+
+    def leave(self, fut: asyncio.Future) -> None:
+        """A caller stops waiting on `fut`. The request is cancelled if it is not done and no caller
+        waits on it any more."""
+        if (n := self._waiters.get(fut, 0)) > 1:
+            self._waiters[fut] = n - 1
+            return
+        self._waiters.pop(fut, None)
+        if not fut.done():
+            fut.cancel()
+
+    def clear(self) -> None:
+        """Cancel all requests in flight."""
+        for fut in list(self._futs.values()):
+            fut.cancel()
+        self._futs.clear()
+
+    def _forget(self, key: t.Hashable, fut: asyncio.Future) -> None:
+        if self._futs.get(key) is fut:
+            del self._futs[key]
@@ -1,17 +1,64 @@
+import asyncio
 import logging
+import random
+import time
+import typing as t
+from dataclasses import dataclass
 
 from aiohttp.client_exceptions import ClientConnectorError, ClientResponseError, ServerTimeoutError
 from aioqzone.api.h5 import QzoneH5API
 from tenacity import RetryError
 
+from aioqzone_feed.api.limit import AdaptiveLimiter
 from aioqzone_feed.message import HeartbeatEmitterMixin
+from aioqzone_feed.metrics import Metrics
 
 log = logging.getLogger(__name__)
+T = t.TypeVar("T")
 known_exc = (ClientResponseError, ServerTimeoutError)
 
 
 class HeartbeatApi(HeartbeatEmitterMixin, QzoneH5API):
-    async def heartbeat_refresh(self) -> None:
+    def __init__(self, *args, **kwds) -> None:
+        super().__init__(*args, **kwds)
+        self.hb_scheduler = HeartbeatScheduler(self)
+        """A scheduler that calls :meth:`.heartbeat_refresh` periodically once started.
+        Replace it to change the intervals.
+
+        .. versionadded:: 1.3.0
+        """
+        self.metrics: t.Optional[Metrics] = None
+        """If set, counters and histograms of requests are recorded in it. Defaults to None.
+
+        .. seealso:: :mod:`aioqzone_feed.metrics`
+
+        .. versionadded:: 1.3.0
+        """
+        self.limiter: t.Optional[AdaptiveLimiter] = None
+        """If set, page, detail and heartbeat requests are limited by it. It can be shared by
+        many apis. Defaults to None.
+
+        .. versionadded:: 1.3.0
+        """
+
+    async def _limited(self, func: t.Callable[..., t.Awaitable[T]], *args) -> T:
+        """Call `func` in a slot of :obj:`.limiter` if it is set."""
+        if (lim := self.limiter) is None:
+            return await func(*args)
+        try:
+            async with lim.slot():
+                return await func(*args)
+        finally:
+            if (m := self.metrics) is not None:
+                m.set("limiter_limit", lim.limit)
+                m.set("limiter_waiting", lim.waiting)
+
+    async def _retry_sleep(self, *args) -> None:
+        if (m := self.metrics) is not None:
+            m.inc("retries")
+        await super()._retry_sleep(*args)
+
+    async def heartbeat_refresh(self) -> t.Union[int, BaseException]:
         """A wrapper function that calls :obj:`hb_api` and handles all kinds of excpetions
         raised during heartbeat.
 
@@ -22,31 +69,179 @@ class HeartbeatApi(HeartbeatEmitterMixin, QzoneH5API):
         .. versionchanged:: 0.13.4
 
             do not retry, just call heartbeat once
+
+        .. versionchanged:: 1.3.0
+
+            return the result. :exc:`asyncio.CancelledError` is raised rather than emitted.
+
+        :return: ``active_cnt`` if the heartbeat succeeded, else the exception.
         """
+        if (m := self.metrics) is None:
+            return await self._heartbeat_refresh()
+
+        start = time.perf_counter()
+        result = await self._heartbeat_refresh()
+        m.observe("heartbeat_seconds", time.perf_counter() - start)
+        if isinstance(result, BaseException):
+            m.inc("heartbeat_failed")
+        else:
+            m.inc("heartbeat_succeeded")
+            m.set("heartbeat_active_cnt", result)
+        return result
 
+    async def _heartbeat_refresh(self) -> t.Union[int, BaseException]:
         try:
-            cnt = (await self.mfeeds_get_count()).active_cnt
+            cnt = (await self._limited(self.mfeeds_get_count)).active_cnt
             log.debug("heartbeat: active_cnt=%d", cnt)
             if cnt > 0:
+                await self.ch_heartbeat_notify.wait_room()
                 self.ch_heartbeat_notify.add_awaitable(self.hb_refresh.emit(cnt))
-            return
+            return cnt
+        except asyncio.CancelledError:
+            raise
         except ClientConnectorError as e:
             log.warning("网络连接较差，或许可以稍后再试。")
             self.ch_heartbeat_notify.add_awaitable(self.hb_failed.emit(e))
+            return e
         except RetryError as e:
             if e.last_attempt.failed:
                 e = e.last_attempt.exception()
                 assert e is not None
             log.warning(e)
             self.ch_heartbeat_notify.add_awaitable(self.hb_failed.emit(e))
+            return e
         except known_exc as e:
             log.warning(e)
             self.ch_heartbeat_notify.add_awaitable(self.hb_failed.emit(e))
+            return e
         except BaseException as e:
             log.error("心跳出现未捕获的异常", exc_info=e)
             self.ch_heartbeat_notify.add_awaitable(self.hb_failed.emit(e))
+            return e
 
     def stop(self) -> None:
         """Clear **all** registered tasks. All tasks will be CANCELLED if not finished."""
         log.warning("HeartbeatApi stopping...")
+        self.hb_scheduler.stop()
         super().stop()
+
+
+@dataclass
+class HeartbeatStats:
+    """Statistics of a :class:`HeartbeatScheduler`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    succeeded: int = 0
+    """Number of succeeded heartbeats."""
+    failed: int = 0
+    """Number of failed heartbeats."""
+    refreshed: int = 0
+    """Number of heartbeats that found new feeds."""
+    consecutive_failures: int = 0
+    last_cnt: int = 0
+    """``active_cnt`` of the last succeeded heartbeat."""
+    last_error: t.Optional[BaseException] = None
+
+
+class HeartbeatScheduler:
+    """Call :meth:`HeartbeatApi.heartbeat_refresh` periodically, with an adaptive interval.
+
+    - If ``active_cnt`` rises, the interval is multiplied by :obj:`.rise_factor` to poll faster;
+    - If nothing changes, the interval is multiplied by :obj:`.idle_factor` to back off;
+    - If the heartbeat fails, e.g. server busy or timeout, the interval is multiplied by
+      :obj:`.fail_factor` to back off harder.
+
+    The interval starts from `interval` and is kept in [:obj:`.min_interval`, :obj:`.max_interval`],
+    and each sleep is randomized by :obj:`.jitter`. :obj:`.min_interval` is the real floor, so
+    the interval can go below the initial one while new feeds keep arriving.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(
+        self,
+        api: HeartbeatApi,
+        *,
+        min_interval: float = 30,
+        max_interval: float = 600,
+        interval: t.Optional[float] = None,
+        rise_factor: float = 0.5,
+        idle_factor: float = 1.5,
+        fail_factor: float = 3,
+        jitter: float = 0.1,
+    ) -> None:
+        """
+        :param api: the api to call heartbeat.
+        :param min_interval: the min interval in seconds, defaults to 30.
+        :param max_interval: the max interval in seconds, defaults to 600.
+        :param interval: the initial interval in seconds, defaults to None, means twice
+            `min_interval` (but no more than `max_interval`), i.e. 60 by default.
+        :param rise_factor: multiply the interval by this if ``active_cnt`` rises, defaults to 0.5.
+        :param idle_factor: multiply the interval by this if nothing changes, defaults to 1.5.
+        :param fail_factor: multiply the interval by this if heartbeat fails, defaults to 3.
+        :param jitter: randomize each sleep by this ratio, defaults to 0.1.
+        """
+        if interval is None:
+            interval = min(2 * min_interval, max_interval)
+        assert 0 < min_interval <= interval <= max_interval
+        assert 0 <= jitter < 1
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rise_factor = rise_factor
+        self.idle_factor = idle_factor
+        self.fail_factor = fail_factor
+        self.jitter = jitter
+        self.interval = interval
+        """The current interval in seconds."""
+        self.stats = HeartbeatStats()
+        self._task: t.Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start calling heartbeat in background. It does nothing if it is already running."""
+        if self.running:
+            return
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        """Stop calling heartbeat. A heartbeat in flight is cancelled."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self.update(await self.api.heartbeat_refresh())
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def update(self, result: t.Union[int, BaseException]) -> None:
+        """Update :obj:`.stats` and :obj:`.interval` with a heartbeat result.
+
+        :param result: the return value of :meth:`HeartbeatApi.heartbeat_refresh`.
+        """
+        stats = self.stats
+        if isinstance(result, BaseException):
+            stats.failed += 1
+            stats.consecutive_failures += 1
+            stats.last_error = result
+            factor = self.fail_factor
+        else:
+            stats.succeeded += 1
+            stats.consecutive_failures = 0
+            if result > 0:
+                stats.refreshed += 1
+            if result > stats.last_cnt:
+                factor = self.rise_factor
+            elif result == stats.last_cnt:
+                factor = self.idle_factor
+            else:
+                factor = 1
+            stats.last_cnt = result
+
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval * factor))
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import typing as t
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from aiohttp.client_exceptions import ClientResponseError, ServerTimeoutError
+from tenacity import RetryError
+
+log = logging.getLogger(__name__)
+
+__all__ = ["is_busy", "HandoffQueue", "AdaptiveLimiter"]
+
+
+def is_busy(exc: BaseException) -> bool:
+    """If an exception means the server is busy, i.e. HTTP 500 or a server timeout."""
+    if isinstance(exc, RetryError) and exc.last_attempt.failed:
+        exc = exc.last_attempt.exception() or exc
+    if isinstance(exc, ClientResponseError):
+        return exc.status == 500
+    return isinstance(exc, ServerTimeoutError)
+
+
+class HandoffQueue:
+    """Requests waiting for a slot of a limiter. A released slot is handed over to a waiter
+    directly, so it cannot be taken by a newcomer in between. Waiters are served in round-robin
+    over their keys, or in FIFO order if they are all of the same key.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(self) -> None:
+        self._queues: "OrderedDict[t.Hashable, t.Deque[asyncio.Future]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._queues)
+
+    async def wait(self, release: t.Callable[[], t.Any], key: t.Hashable = None) -> None:
+        """Wait until a slot is handed over by :meth:`.handoff`.
+
+        :param release: called to pass the slot on, if the waiter is cancelled just after the slot
+            is handed over.
+        :param key: who the request is for, e.g. the uin of an account.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # the slot is handed over just before cancelling
+                release()
+            elif (q := self._queues.get(key)) is not None and fut in q:
+                # a cancelled future may have been skipped by handoff already
+                q.remove(fut)
+                if not q:
+                    del self._queues[key]
+            raise
+
+    def handoff(self) -> bool:
+        """Hand a slot over to the next waiter.
+
+        :return: False if there is no waiter, so the slot should be freed.
+        """
+        while self._queues:
+            key, q = next(iter(self._queues.items()))
+            fut = q.popleft()
+            if q:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not fut.done():
+                fut.set_result(None)
+                return True
+        return False
+
+
+class AdaptiveLimiter:
+    """Limits requests by a token bucket and an adaptive concurrency limit.
+
+    The concurrency limit follows AIMD (additive increase, multiplicative decrease): each succeeded
+    request raises it by ``increase / limit``, i.e. about `increase` per round of requests, and a
+    request that finds the server busy (see :func:`is_busy`) multiplies it by `decrease`.
+    Requests started before a decrease do not decrease it again, so a burst of failures of the
+    same round counts once.
+
+    A limiter can be shared by many apis, e.g. all accounts in a :class:`.FeedApiPool`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: t.Optional[float] = None,
+        burst: int = 1,
+        limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        increase: float = 1,
+        decrease: float = 0.5,
+    ) -> None:
+        """
+        :param rate: tokens added per second, i.e. max requests per second. Defaults to None,
+            means requests are not limited by rate.
+        :param burst: max tokens in the bucket, defaults to 1.
+        :param limit: initial concurrency limit, defaults to 4.
+        :param min_limit: the min concurrency limit, defaults to 1.
+        :param max_limit: the max concurrency limit, defaults to 32.
+        :param increase: additive increase per round of succeeded requests, defaults to 1.
+        :param decrease: multiplicative decrease on busy signals, defaults to 0.5.
+        """
+        assert 1 <= min_limit <= limit <= max_limit
+        assert 0 < decrease < 1
+        assert rate is None or rate > 0
+        self.rate = rate
+        self.burst = burst
+        self.limit = float(limit)
+        """The current concurrency limit."""
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.inflight = 0
+        self.busy = 0
+        """Number of busy signals received."""
+        self._epoch = 0
+        self._tokens = float(burst)
+        self._stamp: t.Optional[float] = None
+        self._waiters = HandoffQueue()
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot while sending a request. The request is taken as succeeded if the block
+        exits normally, or busy if it raises an exception that :func:`is_busy`. Other exceptions
+        do not change the limit.
+        """
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+        else:
+            await self._waiters.wait(self._release)
+
+        epoch = self._epoch
+        try:
+            await self._take_token()
+            yield
+        except Exception as e:
+            if is_busy(e):
+                self._on_busy(epoch)
+            raise
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        finally:
+            self._release()
+
+    async def _take_token(self) -> None:
+        if self.rate is None:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._stamp is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        # take the token in advance, so that concurrent takers queue up behind it
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+    def _on_busy(self, epoch: int) -> None:
+        self.busy += 1
+        if epoch != self._epoch:
+            return
+        self._epoch += 1
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        log.info("server busy, concurrency limit decreased to %.2f", self.limit)
+
+    def _release(self) -> None:
+        self.inflight -= 1
+        while self.inflight < int(self.limit) and self._waiters.handoff():
+            self.inflight += 1
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import time
+import typing as t
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from aiohttp import ClientResponseError
+from aioqzone.api import Loginable
+from aioqzone.exception import QzoneError
+from qqqr.utils.net import ClientAdapter
+from tenacity import RetryError
+from tylisten import FutureStore
+
+from aioqzone_feed.api.feed import FeedH5Api
+from aioqzone_feed.api.limit import AdaptiveLimiter, HandoffQueue
+
+log = logging.getLogger(__name__)
+T = t.TypeVar("T")
+
+__all__ = ["FairGate", "AccountStats", "FeedApiPool"]
+
+
+def is_login_expired(exc: BaseException) -> bool:
+    """If an exception means the login of an account is expired and re-login does not help."""
+    if isinstance(exc, RetryError) and exc.last_attempt.failed:
+        exc = exc.last_attempt.exception() or exc
+    if isinstance(exc, QzoneError):
+        return exc.code in (-3000, -10000)
+    if isinstance(exc, ClientResponseError):
+        return exc.status in (302, 403)
+    return False
+
+
+class FairGate:
+    """Limits requests in flight. Waiting requests are granted slots in round-robin over their keys,
+    so a key with many waiting requests cannot starve the others.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(self, limit: int) -> None:
+        """
+        :param limit: max number of requests in flight.
+        """
+        assert limit > 0
+        self.limit = limit
+        self.inflight = 0
+        self._waiters = HandoffQueue()
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, key: t.Hashable):
+        """Hold a slot in the block.
+
+        :param key: who the request is for, e.g. the uin of an account.
+        """
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+        else:
+            await self._waiters.wait(self._release, key)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        # a slot handed over is still in flight
+        if not self._waiters.handoff():
+            self.inflight -= 1
+
+
+class _GatedClient:
+    """Wraps the shared client, so that each request of an account holds a slot of the gate."""
+
+    def __init__(self, client: ClientAdapter, gate: FairGate, uin: int, stats: "AccountStats"):
+        self.client = client
+        self.gate = gate
+        self.uin = uin
+        self.stats = stats
+
+    @asynccontextmanager
+    async def request(self, method: str, url, **kwds):
+        async with self.gate.slot(self.uin):
+            self.stats.requests += 1
+            async with self.client.request(method, url, **kwds) as r:
+                yield r
+
+
+@dataclass
+class AccountStats:
+    """Statistics of an account in a :class:`FeedApiPool`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    requests: int = 0
+    """HTTP requests sent, including retries."""
+    feeds: int = 0
+    """Feeds got by calls through the pool."""
+    heartbeats: int = 0
+    """Succeeded heartbeats."""
+    errors: int = 0
+    """Failed calls through the pool, including heartbeats."""
+    login_expired: int = 0
+    """Failed calls because the login is expired."""
+    last_error: t.Optional[BaseException] = None
+    suspended_until: float = 0
+    """The account is skipped by the pool until this timestamp (:func:`time.time`)."""
+
+
+class FeedApiPool:
+    """Holds :class:`~aioqzone_feed.api.FeedApi` of many accounts on one shared client.
+
+    - Requests of all accounts share a budget of :obj:`.gate`, which grants slots fairly.
+    - Heartbeats started by :meth:`.start` are spread evenly across accounts.
+    - An account whose login is expired (Qzone code -3000, etc.) is suspended for a while,
+      other accounts are not affected.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(
+        self,
+        client: ClientAdapter,
+        *,
+        max_requests: int = 8,
+        hb_interval: float = 300,
+        suspend: float = 600,
+        limiter: t.Optional[AdaptiveLimiter] = None,
+    ) -> None:
+        """
+        :param client: the client shared by all accounts.
+        :param max_requests: max requests in flight of all accounts, defaults to 8.
+        :param hb_interval: interval (seconds) between two heartbeats of an account, defaults to 300.
+        :param suspend: seconds that an account is skipped after its login expired, defaults to 600.
+        :param limiter: if given, it is shared by apis of all accounts as their
+            :obj:`~aioqzone_feed.api.FeedApi.limiter`, so that all accounts back off together
+            when Qzone is busy.
+        """
+        self.client = client
+        self.gate = FairGate(max_requests)
+        self.hb_interval = hb_interval
+        self.suspend = suspend
+        self.limiter = limiter
+        self.apis: t.Dict[int, FeedH5Api] = {}
+        self.stats: t.Dict[int, AccountStats] = {}
+        self._hb_task: t.Optional[asyncio.Task] = None
+        self._hb_pending: t.Dict[int, asyncio.Future] = {}
+        self._ch_heartbeat = FutureStore()
+
+    def add(self, login: Loginable, **kwds) -> FeedH5Api:
+        """Create an api for an account. It replaces the api of the same uin.
+
+        :param login: login manager of the account.
+        :param kwds: passed to :class:`~aioqzone_feed.api.FeedApi`.
+        """
+        if login.uin in self.apis:
+            self.remove(login.uin)
+        stats = self.stats[login.uin] = AccountStats()
+        client = _GatedClient(self.client, self.gate, login.uin, stats)
+        api = self.apis[login.uin] = FeedH5Api(client, login, **kwds)  # type: ignore
+        api.limiter = self.limiter
+        return api
+
+    def remove(self, uin: int) -> None:
+        """Stop and remove the api of an account."""
+        self.stats.pop(uin, None)
+        if (api := self.apis.pop(uin, None)) is not None:
+            api.stop()
+
+    def active(self) -> t.List[int]:
+        """:return: uins of accounts that are not suspended."""
+        now = time.time()
+        return [uin for uin, st in self.stats.items() if st.suspended_until <= now]
+
+    def resume(self, uin: int) -> None:
+        """Resume a suspended account at once, e.g. after it is logged in again."""
+        self.stats[uin].suspended_until = 0
+
+    def _record_error(self, uin: int, exc: BaseException) -> None:
+        if (st := self.stats.get(uin)) is None:
+            return
+        st.errors += 1
+        st.last_error = exc
+        if is_login_expired(exc):
+            st.login_expired += 1
+            st.suspended_until = time.time() + self.suspend
+            log.warning("login of %d expired, suspended for %ds", uin, self.suspend)
+        else:
+            log.warning("account %d failed: %s", uin, exc)
+
+    async def run(
+        self, func: t.Callable[[FeedH5Api], t.Awaitable[T]]
+    ) -> t.Dict[int, t.Union[T, BaseException]]:
+        """Call `func` with the api of each active account concurrently.
+        An exception of an account does not affect the others.
+
+        :return: result or exception of each account.
+        """
+        uins = self.active()
+        results = await asyncio.gather(*(func(self.apis[i]) for i in uins), return_exceptions=True)
+        for uin, r in zip(uins, results):
+            if isinstance(r, BaseException):
+                if not isinstance(r, Exception):
+                    raise r
+                self._record_error(uin, r)
+        return dict(zip(uins, results))
+
+    async def _run_feeds(self, func: t.Callable[[FeedH5Api], t.Awaitable[int]]):
+        results = await self.run(func)
+        for uin, r in results.items():
+            if isinstance(r, int) and (st := self.stats.get(uin)):
+                st.feeds += r
+        return results
+
+    async def get_feeds_by_second(self, seconds: float, **kwds):
+        """:meth:`~aioqzone_feed.api.FeedApi.get_feeds_by_second` of all active accounts.
+
+        :return: number of feeds got, or the exception, of each account.
+        """
+        return await self._run_feeds(lambda api: api.get_feeds_by_second(seconds, **kwds))
+
+    async def get_new_feeds(self, **kwds):
+        """:meth:`~aioqzone_feed.api.FeedApi.get_new_feeds` of all active accounts.
+
+        :return: number of feeds got, or the exception, of each account.
+        """
+        return await self._run_feeds(lambda api: api.get_new_feeds(**kwds))
+
+    async def heartbeat(self, uin: int) -> t.Union[int, BaseException]:
+        """Call heartbeat of an account once and record the result."""
+        result = await self.apis[uin].heartbeat_refresh()
+        if isinstance(result, BaseException):
+            self._record_error(uin, result)
+        elif st := self.stats.get(uin):
+            st.heartbeats += 1
+        return result
+
+    async def wait(self) -> None:
+        """Wait until feeds of all accounts are emitted."""
+        await asyncio.gather(*(api.wait() for api in self.apis.values()))
+
+    @property
+    def running(self) -> bool:
+        return self._hb_task is not None and not self._hb_task.done()
+
+    def start(self) -> None:
+        """Start heartbeats of all accounts. Each account is heartbeat every :obj:`.hb_interval`
+        seconds, and accounts take turns, so that heartbeats are spread across the interval."""
+        if not self.running:
+            self._hb_task = asyncio.ensure_future(self._hb_loop())
+
+    async def _hb_loop(self) -> None:
+        while True:
+            uins = self.active()
+            if not uins:
+                await asyncio.sleep(min(self.hb_interval, self.suspend))
+                continue
+            step = self.hb_interval / len(uins)
+            for uin in uins:
+                # a slow heartbeat, e.g. waiting for re-login, does not delay other accounts
+                if uin in self.apis and ((fut := self._hb_pending.get(uin)) is None or fut.done()):
+                    self._hb_pending[uin] = self._ch_heartbeat.add_awaitable(self.heartbeat(uin))
+                await asyncio.sleep(step)
+
+    def stop(self) -> None:
+        """Stop heartbeats and all apis."""
+        if self._hb_task is not None:
+            self._hb_task.cancel()
+            self._hb_task = None
+        self._ch_heartbeat.clear()
+        self._hb_pending.clear()
+        for api in self.apis.values():
+            api.stop()
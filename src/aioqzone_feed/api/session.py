@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import typing as t
+from dataclasses import dataclass
+from functools import partial
+
+from aioqzone_feed.api.batch import Batcher, ReorderBuffer
+
+log = logging.getLogger(__name__)
+
+__all__ = ["CrawlSession", "CrawlReport"]
+
+
+@dataclass
+class CrawlReport:
+    """What a crawl with a deadline got, and what was cut off by the deadline.
+
+    .. versionadded:: 1.3.0
+    """
+
+    got: int
+    """Feeds got and dispatched."""
+    emitted: int
+    """Feeds emitted through :obj:`~aioqzone_feed.api.FeedApi.feed_processed` by the deadline."""
+    dropped: int
+    """Feeds dropped by rules."""
+    summarized: int = 0
+    """Feeds emitted from their summaries, since their details were not got in time."""
+    cut_off: bool = False
+    """If paging is stopped by the deadline, so there may be more feeds that are not got."""
+    unemitted: int = 0
+    """Feeds got but not emitted by the deadline."""
+    late: int = 0
+    """Hook emissions not finished by the deadline. They are not cancelled."""
+
+
+class CrawlSession:
+    """A crawl on a :class:`~aioqzone_feed.api.FeedApi`. Feeds of a session are emitted with its own
+    :obj:`.bid`, which is fixed when the session is created, so crawls running at the same time on
+    one api do not tag feeds of each other.
+
+    Sessions are created by :meth:`~aioqzone_feed.api.FeedApi.start_feeds_by_count` and
+    :meth:`~aioqzone_feed.api.FeedApi.start_feeds_by_second`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(self, bid: int) -> None:
+        """
+        :param bid: batch id of feeds got in this session.
+        """
+        self.bid = bid
+        self.got = 0
+        """Number of feeds got and dispatched."""
+        self.dropped = 0
+        """Number of feeds dropped."""
+        self.emitted = 0
+        """Number of feeds emitted through :obj:`~aioqzone_feed.api.FeedApi.feed_processed`."""
+        self.lost = 0
+        """Number of feeds whose detail requests or hook emissions are dropped by a bounded
+        channel, see :class:`~aioqzone_feed.message.channel.BoundedFutureStore`."""
+        self.task: t.Optional["asyncio.Future[int]"] = None
+        """The task of the crawl, which returns the number of feeds got."""
+        self.summarized = 0
+        """Number of feeds emitted from their summaries because of the deadline."""
+        self.cut_off = False
+        """If paging is stopped by the deadline."""
+        self.reorder: t.Optional[ReorderBuffer] = None
+        """Holds processed feeds of this session for ordered emission, if
+        :obj:`~aioqzone_feed.api.FeedApi.emit_order` is set. Feeds of other sessions are never
+        blocked by it."""
+        self._processed_batch: t.Optional[Batcher] = None
+        self._dropped_batch: t.Optional[Batcher] = None
+        self._pending = 0
+        self._cancelled = False
+        self._futs: t.Set[asyncio.Future] = set()
+        self._idle: t.Optional[asyncio.Event] = None
+        self._cutoff: t.Optional[float] = None
+        self._timer: t.Optional[asyncio.TimerHandle] = None
+        self._fallbacks: t.Dict[int, t.Callable[[], t.Any]] = {}
+        self._tokens = 0
+        self._on_lost: t.Optional[t.Callable[[], t.Any]] = None
+        self._on_processed: t.Optional[t.Callable[[t.Any], t.Any]] = None
+        """Called with each feed emitted by this session, before hooks are emitted."""
+        self._on_dropped: t.Optional[t.Callable[[t.Any], t.Any]] = None
+        """Called with each feed dropped by this session, before hooks are emitted."""
+        self._bounded = True
+        """If hook emissions of this session count towards the bound of the notify channel."""
+
+    def __repr__(self) -> str:
+        return (
+            f"<CrawlSession bid={self.bid} got={self.got} dropped={self.dropped} "
+            f"emitted={self.emitted} pending={self._pending}>"
+        )
+
+    @property
+    def pending(self) -> int:
+        """Number of feeds dispatched but not emitted yet, e.g. waiting for details."""
+        return self._pending
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def done(self) -> bool:
+        """If the crawl is finished and all feeds are emitted, or the session is cancelled."""
+        if self._cancelled:
+            return True
+        return (self.task is None or self.task.done()) and not self._pending and not self._futs
+
+    def cancel(self) -> None:
+        """Cancel the crawl and hook emissions of this session. Feeds that are not emitted yet
+        are discarded. Detail requests in flight are not cancelled, since they may be shared
+        with other sessions, but their results are discarded."""
+        if self._cancelled:
+            return
+        self._cancelled = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._fallbacks.clear()
+        if self.reorder is not None:
+            self.reorder.clear()
+        for batcher in self._processed_batch, self._dropped_batch:
+            if batcher is not None:
+                batcher.clear()
+        if self.task is not None:
+            self.task.cancel()
+        for fut in list(self._futs):
+            fut.cancel()
+        self._pending = 0
+        if self._idle is not None:
+            self._idle.set()
+
+    async def wait(self) -> int:
+        """Wait until the crawl is finished and all feeds of this session are emitted.
+
+        :return: number of feeds got.
+        :raise `asyncio.CancelledError`: if the session is cancelled.
+        :raise `tenacity.RetryError`: exception of the crawl.
+        """
+        if self.task is not None:
+            # waiting is cancelled alone, without cancelling the crawl
+            await asyncio.wait([self.task])
+        while self._pending and not self._cancelled:
+            if self._idle is None:
+                self._idle = asyncio.Event()
+            self._idle.clear()
+            await self._idle.wait()
+        if not self._cancelled:
+            self._flush()
+        while self._futs:
+            await asyncio.wait(list(self._futs))
+        if self._cancelled:
+            raise asyncio.CancelledError
+        if self.task is None or (self.cut_off and self.task.cancelled()):
+            return self.got
+        return self.task.result()
+
+    def _flush(self) -> None:
+        """Release feeds held for ordered emission, and flush feeds collected for batch emission."""
+        if self.reorder is not None:
+            self.reorder.flush()
+        for batcher in self._processed_batch, self._dropped_batch:
+            if batcher is not None:
+                batcher.flush()
+
+    def report(self) -> CrawlReport:
+        """What the session got so far, and what was cut off by its deadline."""
+        return CrawlReport(
+            got=self.got,
+            emitted=self.emitted,
+            dropped=self.dropped,
+            summarized=self.summarized,
+            cut_off=self.cut_off,
+            unemitted=self._pending,
+            late=len(self._futs),
+        )
+
+    def _arm(self, cutoff: float) -> None:
+        """Stop paging and give up details at `cutoff`, a time of the running loop."""
+        self._cutoff = cutoff
+        self._timer = asyncio.get_running_loop().call_at(cutoff, self._expire)
+
+    def _out_of_time(self, cost: float) -> bool:
+        """If a step that takes `cost` seconds cannot finish before the cutoff."""
+        if self._cutoff is None:
+            return False
+        return asyncio.get_running_loop().time() + cost > self._cutoff
+
+    def _expire(self) -> None:
+        self._timer = None
+        if self._cancelled:
+            return
+        if self.task is not None and not self.task.done():
+            log.info("crawl session %d is cut off by its deadline", self.bid)
+            self.cut_off = True
+            self.task.cancel()
+        fallbacks, self._fallbacks = self._fallbacks, {}
+        for fallback in fallbacks.values():
+            fallback()
+
+    def _hold(self, fallback: t.Callable[[], t.Any]) -> int:
+        """Register a fallback called at the cutoff, e.g. to emit a feed from its summary.
+
+        :return: a token passed to :meth:`._settle`.
+        """
+        self._tokens += 1
+        self._fallbacks[self._tokens] = fallback
+        return self._tokens
+
+    def _settle(self, token: int) -> bool:
+        """Unregister a fallback.
+
+        :return: False if the fallback has been called.
+        """
+        return self._fallbacks.pop(token, None) is not None
+
+    def _track(self, fut: asyncio.Future, feeds: int = 0) -> None:
+        """Track a hook emission of this session.
+
+        :param feeds: number of feeds in the emission, which are lost if it is dropped.
+        """
+        if fut.done():
+            return
+        self._futs.add(fut)
+        fut.add_done_callback(self._futs.discard)
+        if feeds:
+            fut.add_done_callback(partial(self._on_emitted, feeds))
+
+    def _on_emitted(self, feeds: int, fut: asyncio.Future) -> None:
+        if fut.cancelled() and not self._cancelled:
+            self._lose(feeds)
+
+    def _lose(self, n: int = 1) -> None:
+        """`n` feeds of this session are dropped by a bounded channel."""
+        self.lost += n
+        if self._on_lost is not None:
+            self._on_lost()
+
+    def _enter(self) -> None:
+        """A dispatched feed is waiting to be emitted."""
+        self._pending += 1
+
+    def _leave(self) -> None:
+        """A dispatched feed is emitted or discarded."""
+        if self._pending <= 0:
+            return
+        self._pending -= 1
+        if not self._pending and self._idle is not None:
+            self._idle.set()
+
+    def _on_done(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            log.warning("crawl session %d failed: %s", self.bid, exc)
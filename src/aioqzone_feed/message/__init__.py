@@ -1,4 +1,5 @@
+from .channel import BoundedFutureStore
 from .feed import *
 from .heartbeat import *
 
-__all__ = ["FeedApiEmitterMixin", "HeartbeatEmitterMixin"]
+__all__ = ["FeedApiEmitterMixin", "HeartbeatEmitterMixin", "BoundedFutureStore"]
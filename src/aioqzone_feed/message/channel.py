@@ -0,0 +1,121 @@
+import asyncio
+import typing as t
+from collections import deque
+
+from tylisten.futstore import FutureStore
+
+__all__ = ["OverflowPolicy", "BoundedFutureStore"]
+
+T = t.TypeVar("T")
+OverflowPolicy = t.Literal["block", "drop_oldest", "drop_notice"]
+
+
+class BoundedFutureStore(FutureStore):
+    """A :class:`~tylisten.futstore.FutureStore` with an optional max number of pending futures.
+    What happens if it is full depends on :obj:`.policy`:
+
+    - ``"block"``: producers that call :meth:`.wait_room` wait until a future is done. Awaitables
+      added without waiting are still accepted, so the bound is kept by the producers that wait.
+    - ``"drop_oldest"``: the oldest pending future is cancelled to make room.
+    - ``"drop_notice"``: like ``"drop_oldest"``, and :obj:`.on_drop` is called with the tag of the
+      dropped future, so that a notice can be sent.
+
+    .. versionadded:: 1.3.0
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: OverflowPolicy = "block",
+        on_drop: t.Optional[t.Callable[[t.Any], t.Any]] = None,
+    ) -> None:
+        """
+        :param maxsize: max number of pending futures, defaults to 0, means no limit.
+        :param policy: the overflow policy, defaults to ``"block"``.
+        :param on_drop: called with the tag of a dropped future if `policy` is ``"drop_notice"``.
+        """
+        super().__init__()
+        self.maxsize = maxsize
+        self.policy: OverflowPolicy = policy
+        self.on_drop = on_drop
+        self.dropped = 0
+        """Number of futures dropped so far."""
+        self._tags: t.Dict[asyncio.Future, t.Any] = {}
+        """bounded futures -> tag, in the order they are added"""
+        self._room: t.Deque[asyncio.Future] = deque()
+
+    @property
+    def depth(self) -> int:
+        """Number of pending futures that count towards :obj:`.maxsize`."""
+        return len(self._tags)
+
+    @property
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._tags)
+
+    def add_awaitable(
+        self, func: t.Awaitable[T], tag: t.Any = None, *, bounded: bool = True
+    ) -> "asyncio.Future[T]":
+        """Add an awaitable into this store.
+
+        :param func: the awaitable
+        :param tag: passed to :obj:`.on_drop` if the future is dropped.
+        :param bounded: if the future counts towards :obj:`.maxsize` and can be dropped.
+            Pass False for small and important awaitables, e.g. notices and crawl tasks.
+        :return: the wrapped task
+        """
+        fut = asyncio.ensure_future(func)
+        if fut.done():
+            return fut
+        if bounded:
+            if self.policy != "block":
+                while self.full:
+                    self._drop_oldest()
+            self._tags[fut] = tag
+        self._futs.add(fut)
+        fut.add_done_callback(self._on_done)
+        return fut
+
+    __call__ = add_awaitable
+
+    async def wait_room(self) -> None:
+        """Wait until the store is not :obj:`.full`, if the policy is ``"block"``."""
+        while self.full and self.policy == "block":
+            waiter = asyncio.get_running_loop().create_future()
+            self._room.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # pass the room to another producer
+                    self._wake()
+                raise
+
+    def _drop_oldest(self) -> None:
+        fut = next(iter(self._tags))
+        tag = self._tags.pop(fut)
+        self._futs.discard(fut)
+        fut.cancel()
+        self.dropped += 1
+        if self.policy == "drop_notice" and self.on_drop is not None:
+            self.on_drop(tag)
+
+    def _on_done(self, fut: asyncio.Future) -> None:
+        self._futs.discard(fut)
+        if fut in self._tags:
+            del self._tags[fut]
+            self._wake()
+
+    def _wake(self) -> None:
+        """Wake a producer waiting for room."""
+        while self._room and not self.full:
+            if not (waiter := self._room.popleft()).done():
+                waiter.set_result(None)
+                return
+
+    def clear(self):
+        """Cancel all pending futures, and wake producers waiting for room."""
+        super().clear()
+        while self._room:
+            if not (waiter := self._room.popleft()).done():
+                waiter.set_result(None)
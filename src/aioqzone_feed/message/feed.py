@@ -1,11 +1,20 @@
 import typing as t
 
 from tylisten import hookdef
-from tylisten.futstore import FutureStore
 
+from aioqzone_feed.message.channel import BoundedFutureStore
 from aioqzone_feed.type import FEED_TYPES, BaseFeed, FeedContent
 
-__all__ = ["raw_feed", "processed_feed", "stop_fetch", "FeedApiEmitterMixin"]
+__all__ = [
+    "raw_feed",
+    "processed_feed",
+    "raw_feeds",
+    "processed_feeds",
+    "overflowed_feed",
+    "stop_fetch",
+    "stop_fetch_page",
+    "FeedApiEmitterMixin",
+]
 
 
 @hookdef
@@ -24,12 +33,55 @@ def processed_feed(bid: int, feed: FeedContent) -> t.Any:
     """
 
 
+@hookdef
+def raw_feeds(bid: int, feeds: t.List[BaseFeed]) -> t.Any:
+    """
+    :param bid: Used to identify feed batch (tell from different calling).
+    :param feeds: feeds collected in this batch, in the order they are handled.
+
+    .. versionadded:: 1.3.0
+    """
+
+
+@hookdef
+def processed_feeds(bid: int, feeds: t.List[FeedContent]) -> t.Any:
+    """
+    :param bid: Used to identify feed batch (tell from different calling).
+    :param feeds: feeds collected in this batch, in the order they are processed.
+
+    .. versionadded:: 1.3.0
+    """
+
+
+@hookdef
+def overflowed_feed(bid: int, feed: BaseFeed) -> t.Any:
+    """
+    :param bid: Used to identify feed batch (tell from different calling).
+    :param feed: the feed whose emission is dropped because the notify channel is full.
+        Only the fields of :class:`BaseFeed` are kept, so it can be got again later.
+
+    .. versionadded:: 1.3.0
+    """
+
+
 @hookdef
 def stop_fetch(feed: FEED_TYPES) -> bool:
     """An async callback to determine if fetch should be stopped (after processing current batch)."""
     return False
 
 
+@hookdef
+def stop_fetch_page(feeds: t.List[FEED_TYPES]) -> t.Optional[int]:
+    """An async callback to determine if fetch should be stopped, called once per page.
+
+    :param feeds: all feeds on the page, i.e. ``vFeeds``.
+    :return: the index of the first feed that should not be got. Feeds from this index are skipped
+        and fetch is stopped after this page. Return None to go on.
+
+    .. versionadded:: 1.3.0
+    """
+
+
 class FeedApiEmitterMixin:
     def __init__(self, *args, **kwds) -> None:
         super().__init__(*args, **kwds)
@@ -37,14 +89,43 @@ class FeedApiEmitterMixin:
         """This emitter is triggered when a feed is dropped."""
         self.feed_processed = processed_feed()
         """This emitter is triggered when a feed is processed."""
+        self.feeds_dropped = raw_feeds()
+        """Like :obj:`.feed_dropped`, but triggered once per list of feeds if batch emission is enabled.
+
+        .. versionadded:: 1.3.0
+        """
+        self.feeds_processed = processed_feeds()
+        """Like :obj:`.feed_processed`, but triggered once per list of feeds if batch emission is enabled.
+
+        .. versionadded:: 1.3.0
+        """
         self.feed_media_updated = processed_feed()
         """This emitter is triggered when a feed's media is updated."""
         self.stop_fetch = stop_fetch()
         """This hook is used to determin whether a fetch should stop."""
-        self._ch_feed_dispatch = FutureStore()
+        self.stop_fetch_page = stop_fetch_page()
+        """Like :obj:`.stop_fetch`, but it is called once per page and returns where to cut the page.
+
+        .. versionadded:: 1.3.0
+        """
+        self.feed_overflowed = overflowed_feed()
+        """This emitter is triggered when an emission of a feed is dropped because
+        :obj:`.ch_feed_notify` is full and its policy is ``"drop_notice"``. If a batch emission
+        is dropped, it is triggered for each feed of the batch.
+
+        .. versionadded:: 1.3.0
+        """
+        self._ch_feed_dispatch = BoundedFutureStore()
         """An internal future store serves as feed dispatch channel."""
-        self.ch_feed_notify = FutureStore()
-        """A future store serves as message notify channel."""
+        self.ch_feed_notify = BoundedFutureStore()
+        """A future store serves as message notify channel. Set its
+        :obj:`~.BoundedFutureStore.maxsize` and :obj:`~.BoundedFutureStore.policy` to bound the
+        pending hook emissions, e.g. if hooks are slow.
+
+        .. versionchanged:: 1.3.0
+
+            it is a :class:`~aioqzone_feed.message.channel.BoundedFutureStore`, unbounded by default.
+        """
 
     def stop(self):
         """Clear future stores."""
@@ -1,7 +1,8 @@
 import typing as t
 
 from tylisten import hookdef
-from tylisten.futstore import FutureStore
+
+from aioqzone_feed.message.channel import BoundedFutureStore
 
 __all__ = ["heartbeat_failed", "heartbeat_refresh", "HeartbeatEmitterMixin"]
 
@@ -41,8 +42,13 @@ class HeartbeatEmitterMixin:
         """This emitter is triggered after a heartbeat succeeded and there are new feeds.
         Use this event to wait for all dispatch task to be finished, and send received feeds.
         """
-        self.ch_heartbeat_notify = FutureStore()
-        """A future store serves as heartbeat channel."""
+        self.ch_heartbeat_notify = BoundedFutureStore()
+        """A future store serves as heartbeat channel.
+
+        .. versionchanged:: 1.3.0
+
+            it is a :class:`~aioqzone_feed.message.channel.BoundedFutureStore`, unbounded by default.
+        """
 
     def stop(self):
         """Clear future stores."""
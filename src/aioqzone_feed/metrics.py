@@ -0,0 +1,181 @@
+"""Counters, gauges and histograms of each crawl stage.
+
+Metrics are recorded only if :obj:`~aioqzone_feed.api.FeedApi.metrics` is set, so they cost
+nothing by default. Names recorded by the apis:
+
+========================= ========= =========================================================
+name                      kind      meaning
+========================= ========= =========================================================
+``pages``                 counter   feed pages got
+``page_errors``           counter   feed page requests failed
+``page_seconds``          histogram time of a page request
+``page_coalesced``        counter   page requests that shared an identical request in flight
+``feeds``                 counter   feeds got and dispatched
+``feeds_dropped``         counter   feeds dropped by rules
+``feeds_emitted``         counter   feeds emitted through :obj:`.feed_processed`
+``feeds_summarized``      counter   feeds emitted from summaries because of a crawl deadline
+``drop_rule_seconds``     histogram time of checking a feed with drop rules
+``detail_requests``       counter   detail requests sent
+``detail_errors``         counter   detail requests failed, including timeouts
+``detail_timeouts``       counter   detail requests timed out
+``detail_refused``        counter   detail requests refused because the pool is full
+``detail_cache_hits``     counter   details got from cache
+``detail_coalesced``      counter   detail requests that shared a request of the same feed
+``detail_seconds``        histogram time of a detail request, not including queueing
+``convert_seconds``       histogram time of converting a feed into :class:`.FeedContent`
+``hook_seconds``          histogram time of a :obj:`.feed_processed` or batch hook emission
+``retries``               counter   requests retried after re-login
+``heartbeat_succeeded``   counter   succeeded heartbeats
+``heartbeat_failed``      counter   failed heartbeats
+``heartbeat_seconds``     histogram time of a heartbeat request
+``heartbeat_active_cnt``  gauge     ``active_cnt`` of the last heartbeat
+``limiter_limit``         gauge     concurrency limit of :obj:`~.HeartbeatApi.limiter`
+``limiter_waiting``       gauge     requests waiting for a slot of the limiter
+``detail_pending``        gauge     detail requests running or queued in the pool
+``notify_pending``        gauge     hook emissions not finished in ``ch_feed_notify``
+``notify_dropped``        gauge     hook emissions dropped by ``ch_feed_notify`` so far
+``dispatch_pending``      gauge     detail waits not finished in the dispatch channel
+========================= ========= =========================================================
+
+.. versionadded:: 1.3.0
+"""
+
+import time
+import typing as t
+from bisect import bisect_left
+from contextlib import contextmanager
+
+__all__ = ["Histogram", "Metrics", "prometheus_text", "timed"]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+"""Default upper bounds (seconds) of histogram buckets."""
+
+Callback = t.Callable[[str, float], t.Any]
+T = t.TypeVar("T")
+
+
+class Histogram:
+    """A histogram with fixed buckets. The last count is of the ``+Inf`` bucket."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: t.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by the upper bound of the bucket it falls in.
+
+        :return: the upper bound, ``inf`` if it is in the last bucket, or ``nan`` if there is no value.
+        """
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        acc = 0
+        for bound, cnt in zip(self.buckets, self.counts):
+            acc += cnt
+            if acc >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """A registry of metrics. Assign it to :obj:`~aioqzone_feed.api.FeedApi.metrics` to enable
+    recording, then read :meth:`.snapshot`, export with :func:`prometheus_text`, or pass a
+    `callback` to push every record to another system.
+    """
+
+    def __init__(
+        self,
+        *,
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS,
+        callback: t.Optional[Callback] = None,
+    ) -> None:
+        """
+        :param buckets: upper bounds of histogram buckets, defaults to :obj:`DEFAULT_BUCKETS`.
+        :param callback: if given, it is called with `(name, value)` on every record.
+        """
+        self.buckets = tuple(buckets)
+        self.callback = callback
+        self.counters: t.Dict[str, float] = {}
+        self.gauges: t.Dict[str, float] = {}
+        self.histograms: t.Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Increase a counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self.callback:
+            self.callback(name, value)
+
+    def set(self, name: str, value: float) -> None:
+        """Set a gauge."""
+        self.gauges[name] = value
+        if self.callback:
+            self.callback(name, value)
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a value in a histogram."""
+        if (h := self.histograms.get(name)) is None:
+            h = self.histograms[name] = Histogram(self.buckets)
+        h.observe(value)
+        if self.callback:
+            self.callback(name, value)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record the time (seconds) spent in the block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> t.Dict[str, t.Any]:
+        """:return: a dict of all metrics. A histogram is represented by its count, sum, p50 and p99."""
+        d: t.Dict[str, t.Any] = dict(self.counters)
+        d.update(self.gauges)
+        for name, h in self.histograms.items():
+            d[name] = dict(count=h.count, sum=h.sum, p50=h.quantile(0.5), p99=h.quantile(0.99))
+        return d
+
+    def reset(self) -> None:
+        """Remove all recorded metrics."""
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+
+
+async def timed(metrics: Metrics, name: str, aw: t.Awaitable[T]) -> T:
+    """Await `aw` and record the time spent in a histogram."""
+    with metrics.timer(name):
+        return await aw
+
+
+def prometheus_text(metrics: Metrics, prefix: str = "aioqzone_feed") -> str:
+    """Export metrics in the Prometheus text exposition format.
+    Counters are suffixed with ``_total``.
+
+    :param prefix: prefix of all metric names.
+    """
+    lines = []
+    for name, value in sorted(metrics.counters.items()):
+        lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+    for name, value in sorted(metrics.gauges.items()):
+        lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+    for name, h in sorted(metrics.histograms.items()):
+        full = f"{prefix}_{name}"
+        lines.append(f"# TYPE {full} histogram")
+        acc = 0
+        for bound, cnt in zip(h.buckets, h.counts):
+            acc += cnt
+            lines.append(f'{full}_bucket{{le="{bound}"}} {acc}')
+        lines.append(f'{full}_bucket{{le="+Inf"}} {h.count}')
+        lines += [f"{full}_sum {h.sum}", f"{full}_count {h.count}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,129 @@
+"""Declarative drop rules.
+
+.. versionadded:: 1.3.0
+"""
+
+import re
+import typing as t
+from collections import Counter
+
+from aioqzone_feed.type import FEED_TYPES
+
+__all__ = ["DropRules"]
+
+
+class _PrefixTrie:
+    """A character trie that finds which of the given prefixes a string starts with."""
+
+    def __init__(self, prefixes: t.Iterable[str]) -> None:
+        self.root: t.Dict[t.Optional[str], t.Any] = {}
+        self.size = 0
+        for p in prefixes:
+            if not p:
+                # an empty prefix would match every string
+                continue
+            node = self.root
+            for c in p:
+                node = node.setdefault(c, {})
+            if None not in node:
+                self.size += 1
+            # `None` marks the end of a prefix
+            node[None] = p
+
+    def match(self, s: str) -> t.Optional[str]:
+        """:return: the shortest prefix that `s` starts with, or None."""
+        node = self.root
+        for c in s:
+            if None in node:
+                return node[None]
+            node = node.get(c)
+            if node is None:
+                return None
+        return node.get(None)
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class DropRules:
+    """A set of rules deciding which feeds should be dropped.
+
+    Rules are compiled once when this object is created: uins, appids, typeids and nicknames
+    are looked up in hash sets, fid prefixes in a trie, and keywords are searched in the summary
+    with one regular expression. So the cost per feed does not grow with the number of entries.
+
+    Hits are counted by rule in :obj:`.hits`, e.g. ``hits[("uin", 20050606)]``.
+    """
+
+    def __init__(
+        self,
+        *,
+        uins: t.Iterable[int] = (),
+        appids: t.Iterable[int] = (),
+        typeids: t.Iterable[int] = (),
+        fid_prefixes: t.Iterable[str] = (),
+        nicknames: t.Iterable[str] = (),
+        keywords: t.Iterable[str] = (),
+    ) -> None:
+        """
+        :param uins: drop feeds owned by these users.
+        :param appids: drop feeds with these :term:`appid`.
+        :param typeids: drop feeds with these typeid.
+        :param fid_prefixes: drop feeds whose :term:`fid` starts with any of these strings.
+            Empty strings are ignored.
+        :param nicknames: drop feeds whose owner nickname is any of these strings.
+        :param keywords: drop feeds whose summary contains any of these strings. Empty strings
+            are ignored. The summary of a `hasmore` feed is truncated, so the api checks the feed
+            again after its detail is got.
+        """
+        self.uins = frozenset(uins)
+        self.appids = frozenset(appids)
+        self.typeids = frozenset(typeids)
+        self.nicknames = frozenset(nicknames)
+        self._fid_prefixes = _PrefixTrie(fid_prefixes)
+        keywords = sorted({i for i in keywords if i}, key=len, reverse=True)
+        self._n_keywords = len(keywords)
+        self._keywords = re.compile("|".join(map(re.escape, keywords))) if keywords else None
+        self.hits: t.Counter[t.Tuple[str, t.Union[int, str]]] = Counter()
+        """Hit counts by `(kind, entry)`."""
+
+    @classmethod
+    def default(cls):
+        """Rules that drop known advertisements."""
+        return cls(uins=[20050606], fid_prefixes=["advertisement"])
+
+    def __len__(self) -> int:
+        """Number of entries in all rules."""
+        return (
+            len(self.uins)
+            + len(self.appids)
+            + len(self.typeids)
+            + len(self.nicknames)
+            + len(self._fid_prefixes)
+            + self._n_keywords
+        )
+
+    def match(self, feed: FEED_TYPES) -> t.Optional[t.Tuple[str, t.Union[int, str]]]:
+        """Check a feed against all rules, and count the hit rule.
+
+        :return: the first hit rule as `(kind, entry)`, or None if no rule is hit.
+        """
+        hit = self._match(feed)
+        if hit is not None:
+            self.hits[hit] += 1
+        return hit
+
+    def _match(self, feed: FEED_TYPES) -> t.Optional[t.Tuple[str, t.Union[int, str]]]:
+        if (uin := feed.userinfo.uin) in self.uins:
+            return "uin", uin
+        if (appid := feed.common.appid) in self.appids:
+            return "appid", appid
+        if (typeid := feed.common.typeid) in self.typeids:
+            return "typeid", typeid
+        if (nickname := feed.userinfo.nickname) in self.nicknames:
+            return "nickname", nickname
+        if (prefix := self._fid_prefixes.match(feed.fid)) is not None:
+            return "fid_prefix", prefix
+        if self._keywords and (m := self._keywords.search(feed.summary.summary)):
+            return "keyword", m.group()
+        return None
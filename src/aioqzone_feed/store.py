@@ -0,0 +1,254 @@
+"""Stores that keep crawl states across calls.
+
+.. versionadded:: 1.3.0
+"""
+
+import json
+import os
+import typing as t
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from os import PathLike
+from pathlib import Path
+
+__all__ = [
+    "SeenStore",
+    "MemorySeenStore",
+    "FileSeenStore",
+    "Checkpoint",
+    "CheckpointStore",
+    "MemoryCheckpointStore",
+    "FileCheckpointStore",
+]
+
+FeedKey = t.Tuple[int, int]
+"""`(uin, abstime)`, the same fields as :meth:`~aioqzone_feed.type.BaseFeed.__hash__` uses."""
+
+
+class SeenStore(ABC):
+    """Remembers feeds that have been got, and the watermark (the latest abstime got) of each feed stream.
+
+    A feed stream is identified by the :term:`uin` of the profile, or ``0`` for active feeds.
+
+    Subclasses must implement all abstract methods.
+    """
+
+    @abstractmethod
+    def __contains__(self, key: FeedKey) -> bool: ...
+
+    @abstractmethod
+    def add(self, key: FeedKey) -> None:
+        """Mark a feed as seen."""
+
+    @abstractmethod
+    def watermark(self, stream: int) -> int:
+        """Get the watermark of a feed stream.
+
+        :param stream: uin of the profile, or ``0`` for active feeds.
+        :return: the latest abstime got, or ``0`` if there is none.
+        """
+
+    @abstractmethod
+    def set_watermark(self, stream: int, abstime: int) -> None:
+        """Set the watermark of a feed stream."""
+
+    def flush(self) -> None:
+        """Persist changes, if the store is persistent. It is called after each page of a crawl.
+        Does nothing by default."""
+
+
+class MemorySeenStore(SeenStore):
+    """A :class:`SeenStore` in memory. The least recently used feeds are forgotten if
+    more than :obj:`maxsize` feeds are stored."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self._keys: "OrderedDict[FeedKey, None]" = OrderedDict()
+        self._watermarks: t.Dict[int, int] = {}
+
+    def __contains__(self, key: FeedKey) -> bool:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: FeedKey) -> None:
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        if len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+
+    def watermark(self, stream: int) -> int:
+        return self._watermarks.get(stream, 0)
+
+    def set_watermark(self, stream: int, abstime: int) -> None:
+        self._watermarks[stream] = abstime
+
+
+class FileSeenStore(MemorySeenStore):
+    """A :class:`MemorySeenStore` backed by a text file, so that it survives restarts.
+
+    Changes are appended to the file, and the file is compacted when it is loaded, or once more
+    than twice `maxsize` lines are appended, so it does not grow unbounded. Changes are
+    flushed every `flush_every` marks, on watermark changes and after each page of a crawl,
+    so a crash loses few marks at most.
+    Call :meth:`.close` when it is no longer used, or use it as a context manager.
+    """
+
+    def __init__(
+        self, path: t.Union[str, PathLike], maxsize: int = 65536, flush_every: int = 64
+    ) -> None:
+        """
+        :param path: path of the file.
+        :param maxsize: see :class:`MemorySeenStore`, defaults to 65536.
+        :param flush_every: flush after this many marks, defaults to 64.
+        """
+        assert flush_every > 0
+        super().__init__(maxsize)
+        self.flush_every = flush_every
+        self._unflushed = 0
+        self._appended = 0
+        self.path = Path(path)
+        if self.path.exists():
+            self._load()
+        self._dump()
+        self._f = open(self.path, "a", encoding="utf8")
+
+    def _append(self, line: str) -> None:
+        self._f.write(line)
+        self._appended += 1
+
+    def _load(self):
+        with open(self.path, encoding="utf8") as f:
+            for line in f:
+                a, _, b = line.partition(" ")
+                if not b:
+                    continue
+                if a.startswith("@"):
+                    super().set_watermark(int(a[1:]), int(b))
+                else:
+                    super().add((int(a), int(b)))
+
+    def _dump(self):
+        with open(self.path, "w", encoding="utf8") as f:
+            f.writelines(f"@{k} {v}\n" for k, v in self._watermarks.items())
+            f.writelines(f"{k[0]} {k[1]}\n" for k in self._keys)
+        self._appended = 0
+
+    def _compact(self) -> None:
+        if self._appended <= 2 * self.maxsize:
+            return
+        self._f.close()
+        self._dump()
+        self._unflushed = 0
+        self._f = open(self.path, "a", encoding="utf8")
+
+    def add(self, key: FeedKey) -> None:
+        if key not in self._keys:
+            self._append(f"{key[0]} {key[1]}\n")
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self.flush()
+        super().add(key)
+        self._compact()
+
+    def set_watermark(self, stream: int, abstime: int) -> None:
+        self._append(f"@{stream} {abstime}\n")
+        super().set_watermark(stream, abstime)
+        self.flush()
+        self._compact()
+
+    def flush(self) -> None:
+        """Flush changes to the file."""
+        self._f.flush()
+        self._unflushed = 0
+
+    def close(self) -> None:
+        """Flush changes and close the file."""
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@dataclass
+class Checkpoint:
+    """The state of a crawl after a page is processed."""
+
+    uin: t.Optional[int]
+    """The profile being crawled, or None for active feeds."""
+    attach_info: str
+    """The ``attach_info`` to request the next page."""
+    cnt_got: int
+    """Number of feeds got so far."""
+    abstime: int
+    """abstime of the last feed on the processed page."""
+    qzonetoken: str = ""
+    """The qzonetoken used by this crawl. Pages after the first one cannot be requested without it."""
+
+
+class CheckpointStore(ABC):
+    """Saves :class:`Checkpoint` by crawl name, so that an interrupted crawl can be resumed.
+
+    Subclasses must implement all abstract methods.
+    """
+
+    @abstractmethod
+    def get(self, name: str) -> t.Optional[Checkpoint]: ...
+
+    @abstractmethod
+    def put(self, name: str, checkpoint: Checkpoint) -> None: ...
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """Delete a checkpoint if it exists."""
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """A :class:`CheckpointStore` in memory. It can resume crawls interrupted by errors, but not by restarts."""
+
+    def __init__(self) -> None:
+        self._cps: t.Dict[str, Checkpoint] = {}
+
+    def get(self, name: str) -> t.Optional[Checkpoint]:
+        return self._cps.get(name)
+
+    def put(self, name: str, checkpoint: Checkpoint) -> None:
+        self._cps[name] = checkpoint
+
+    def delete(self, name: str) -> None:
+        self._cps.pop(name, None)
+
+
+class FileCheckpointStore(MemoryCheckpointStore):
+    """A :class:`CheckpointStore` backed by a json file. The file is replaced atomically on every change."""
+
+    def __init__(self, path: t.Union[str, PathLike]) -> None:
+        super().__init__()
+        self.path = Path(path)
+        if self.path.exists():
+            with open(self.path, encoding="utf8") as f:
+                self._cps = {k: Checkpoint(**v) for k, v in json.load(f).items()}
+
+    def _dump(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf8") as f:
+            json.dump({k: asdict(v) for k, v in self._cps.items()}, f)
+        os.replace(tmp, self.path)
+
+    def put(self, name: str, checkpoint: Checkpoint) -> None:
+        super().put(name, checkpoint)
+        self._dump()
+
+    def delete(self, name: str) -> None:
+        if name in self._cps:
+            super().delete(name)
+            self._dump()
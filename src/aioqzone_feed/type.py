@@ -1,15 +1,95 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
 from aioqzone.model import FeedData, ProfileFeedData
 from aioqzone.model.api.feed import FeedOriginal, FeedVideo, PicData, Share
 from aioqzone.model.api.profile import ProfilePicData
 from aioqzone.model.protocol import ConEntity
 from aioqzone.utils.entity import split_entities
+from pydantic import ValidationError
+from pydantic_core import SchemaValidator, core_schema
 
 FEED_TYPES = Union[FeedData, ProfileFeedData]
+RawDict = Dict[str, Any]
+_D = TypeVar("_D")
 
+_http_url = SchemaValidator(
+    core_schema.url_schema(max_length=2083, allowed_schemes=["http", "https"])
+)
+"""Validates urls like :class:`pydantic.HttpUrl`, without wrapping the result in it."""
+_COMMON_KEYS = frozenset(("time", "appid", "feedstype", "curlikekey", "orglikekey"))
+"""Required keys of ``comm`` of a profile feed."""
+_FEED_COMMON_KEYS = _COMMON_KEYS | {"ugckey", "ugcrightkey", "right_info", "wup_feeds_type"}
+"""Required keys of ``comm`` of an active feed."""
 
+
+def _url(url: str) -> str:
+    """Normalize a url like :class:`pydantic.HttpUrl` does."""
+    return str(_http_url.validate_python(url))
+
+
+def _key(key: str) -> str:
+    """A ``curlikekey`` or ``orglikekey``, which is a url if it can be one."""
+    try:
+        return _url(key)
+    except ValidationError:
+        return key
+
+
+def _extremes(urls: RawDict) -> Tuple[RawDict, RawDict]:
+    """:return: the largest and the smallest photo in a raw ``photourl`` dict."""
+    largest = smallest = None
+    max_area = min_area = 0
+    for p in urls.values():
+        area = int(p["height"]) * int(p["width"])
+        if largest is None or area > max_area:
+            largest, max_area = p, area
+        if smallest is None or area < min_area:
+            smallest, min_area = p, area
+    if largest is None or smallest is None:
+        raise ValueError("empty photourl")
+    return largest, smallest
+
+
+def _common(comm: RawDict, profile: bool) -> RawDict:
+    if not (_COMMON_KEYS if profile else _FEED_COMMON_KEYS) <= comm.keys():
+        raise KeyError("comm")
+    return comm
+
+
+def _user(info: RawDict) -> Tuple[int, str]:
+    uin = info["uin"] if "uin" in info else info["user"]["uin"]
+    if "nickname" in info:
+        return int(uin), info["nickname"]
+    return int(uin), info.get("user", {}).get("nickname", "")
+
+
+def _slotted(cls: Type[_D]) -> Type[_D]:
+    """Recreate a dataclass with ``__slots__``, like ``dataclass(slots=True)`` since Python 3.10.
+    Fields that are already slots of the base classes are not added again. A ``__weakref__`` slot
+    is added to root classes, so instances can still be weakly referenced.
+
+    .. versionadded:: 1.3.0
+    """
+    inherited = {s for b in cls.__mro__[1:] for s in getattr(b, "__slots__", ())}
+    names = tuple(f.name for f in fields(cls) if f.name not in inherited)
+    if "__weakref__" not in inherited:
+        names += ("__weakref__",)
+
+    ns = dict(cls.__dict__)
+    for name in names:
+        # remove default values, they are kept by the generated __init__
+        ns.pop(name, None)
+    ns.pop("__dict__", None)
+    ns.pop("__weakref__", None)
+    ns["__slots__"] = names
+
+    new_cls = type(cls)(cls.__name__, cls.__bases__, ns)
+    new_cls.__qualname__ = cls.__qualname__
+    return new_cls
+
+
+@_slotted
 @dataclass
 class VisualMedia:
     height: int
@@ -48,6 +128,41 @@ class VisualMedia:
             is_video=True,
         )
 
+    @classmethod
+    def from_raw_pic(cls, pic: RawDict, profile: bool = False):
+        """Like :meth:`.from_pic`, but build from a raw ``picdata`` item without validating it.
+
+        :param profile: if the item is from a profile page, i.e. a :class:`ProfilePicData`.
+
+        .. versionadded:: 1.3.0
+        """
+        if not profile and (video := pic["videodata"]).get("videourl"):
+            return cls.from_raw_video(video)
+
+        raw, thumb = _extremes(pic["photourl"])
+        return cls(
+            is_video=False,
+            height=int(raw["height"] if profile else pic["origin_height"]),
+            width=int(raw["width"] if profile else pic["origin_width"]),
+            raw=_url(raw["url"]),
+            thumbnail=_url(thumb["url"]),
+        )
+
+    @classmethod
+    def from_raw_video(cls, video: RawDict):
+        """Like :meth:`.from_video`, but build from a raw ``videodata`` dict.
+
+        .. versionadded:: 1.3.0
+        """
+        cover, _ = _extremes(video["coverurl"])
+        return cls(
+            height=int(cover["height"]),
+            width=int(cover["width"]),
+            thumbnail=_url(cover["url"]),
+            raw=_url(video["videourl"]),
+            is_video=True,
+        )
+
     @classmethod
     def from_profile_picdata(cls, pic: ProfilePicData):
         raw = pic.photourl.largest
@@ -61,6 +176,7 @@ class VisualMedia:
         )
 
 
+@_slotted
 @dataclass
 class BaseFeed:
     """FeedModel is a model for storing a feed, with the info to hashing and retrieving the feed."""
@@ -136,6 +252,15 @@ class BaseFeed:
 
 @dataclass
 class BaseDetail:
+    """A mixin of feed contents. Its fields are slots of the concrete class, e.g. :class:`FeedContent`.
+
+    .. versionchanged:: 1.3.0
+
+        This class has no slot and cannot be instantiated alone.
+    """
+
+    __slots__ = ()
+
     entities: List[ConEntity] = field(default_factory=list)
     forward: Union["FeedContent", str, None] = None
     """unikey to the feed, or the content itself."""
@@ -171,11 +296,149 @@ class BaseDetail:
             self.media.insert(0, VisualMedia.from_video(obj.video))
 
 
+@_slotted
 @dataclass
 class FeedContent(BaseDetail, BaseFeed):
     """FeedContent is feed with contents. This might be the common structure to
-    represent a feed as what it's known."""
+    represent a feed as what it's known.
+
+    .. versionchanged:: 1.3.0
+
+        Instances of :class:`VisualMedia`, :class:`BaseFeed` and :class:`FeedContent` have
+        ``__slots__`` instead of ``__dict__``.
+    """
 
     def __hash__(self) -> int:
         media_hash = hash(tuple(i.raw for i in self.media)) if self.media else 0
         return hash((self.uin, self.abstime, self.forward, media_hash))
+
+    @classmethod
+    def from_raw(cls, obj: RawDict, profile: bool = False):
+        """Build a feed with contents from a raw ``vFeeds`` item, i.e. the decoded json of a page,
+        without validating it into a :class:`FeedData`. It is several times faster than
+        :meth:`.from_feed` plus :meth:`.set_detail` on a validated feed, and gives the same result.
+
+        A payload of an unexpected shape is validated and converted the slow way, so the same
+        :exc:`pydantic.ValidationError` is raised if it is invalid. Some invalid fields that are
+        not used, e.g. ``comment``, are not checked.
+
+        .. note:: Photos of the same size in ``photourl`` are kept in a set by the model, so which
+            of them is taken is not defined. This method takes the first one.
+
+        :param profile: if the item is from a profile page, i.e. a :class:`ProfileFeedData`.
+
+        .. versionadded:: 1.3.0
+        """
+        try:
+            return cls._from_raw(obj, profile)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            model = (ProfileFeedData if profile else FeedData).model_validate(obj)
+            self = cls.from_feed(model)
+            self.set_detail(model)
+            return self
+
+    @classmethod
+    def _from_raw(cls, obj: RawDict, profile: bool):
+        comm = _common(obj["comm"], profile)
+        uin, nickname = _user(obj["userinfo"])
+        self = cls(
+            appid=int(comm["appid"]),
+            typeid=int(comm["feedstype"]),
+            fid=obj["id"]["cellid"],
+            abstime=int(comm["time"]),
+            uin=uin,
+            nickname=nickname,
+            unikey=_key(comm["orglikekey"]),
+            curkey=_key(comm["curlikekey"]),
+            islike=bool(obj.get("like", {}).get("isliked", False)),
+            entities=split_entities(obj.get("summary", {}).get("summary", "")),
+        )
+        if (org := obj.get("original")) is not None:
+            self.forward = _forward_from_raw(org, profile)
+        self.media = _media_from_raw(obj, profile)
+        return self
+
+
+def _media_from_raw(obj: RawDict, profile: bool) -> List[VisualMedia]:
+    media = []
+    if (pic := obj.get("pic")) is not None:
+        pics = pic["picdata"]["pic"] if profile else pic["picdata"]
+        media = [VisualMedia.from_raw_pic(i, profile) for i in pics]
+    if not profile and (video := obj.get("video")) is not None:
+        media.insert(0, VisualMedia.from_raw_video(video))
+    return media
+
+
+def _forward_from_raw(org: RawDict, profile: bool) -> Union[FeedContent, str]:
+    o = {k.removeprefix("cell_"): i for k, i in org.items()}
+    if "id" not in o or "userinfo" not in o or "comm" not in o:
+        # a share
+        return _key(_common(org["cell_comm"], profile)["orglikekey"])
+
+    comm = _common(o["comm"], profile)
+    uin, nickname = _user(o["userinfo"])
+    fwd = FeedContent(
+        entities=split_entities(o.get("summary", {}).get("summary", "").removeprefix("：")),
+        appid=int(comm["appid"]),
+        typeid=int(comm["feedstype"]),
+        fid=o["id"]["cellid"],
+        abstime=int(comm["time"]),
+        uin=uin,
+        nickname=nickname,
+        curkey=_key(comm["curlikekey"]),
+        unikey=_key(comm["orglikekey"]),
+    )
+    fwd.media = _media_from_raw(o, profile)
+    return fwd
+
+
+def _lazy_slot(name: str):
+    slot = FeedContent.__dict__[name]
+
+    def fget(self: "LazyFeedContent"):
+        self.materialize()
+        return slot.__get__(self)
+
+    def fset(self: "LazyFeedContent", value):
+        slot.__set__(self, value)
+
+    return property(fget, fset, doc=f"Same as :obj:`FeedContent.{name}`, parsed on first access.")
+
+
+class LazyFeedContent(FeedContent):
+    """A :class:`FeedContent` whose :obj:`.entities`, :obj:`.forward` and :obj:`.media` are parsed
+    on first access, from the raw feed kept by :meth:`.set_detail`. The raw feed is released once
+    they are parsed.
+
+    Fields of :class:`BaseFeed` are always available without parsing, so consumers that only
+    read them, e.g. `uin`, `abstime` and `curkey`, never pay for parsing.
+
+    .. note:: :meth:`FeedContent.__hash__`, ``repr`` and comparing with another feed access the
+        contents, so they cause parsing.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ("_raw",)
+
+    entities = _lazy_slot("entities")
+    forward = _lazy_slot("forward")
+    media = _lazy_slot("media")
+
+    def set_detail(self, obj: Union[FeedData, ProfileFeedData]):
+        """Keep the raw feed. It will be parsed on first access to the contents."""
+        self._raw = obj
+
+    def materialize(self) -> None:
+        """Parse the contents now if they are not parsed yet."""
+        raw = getattr(self, "_raw", None)
+        if raw is not None:
+            self._raw = None
+            BaseDetail.set_detail(self, raw)
+
+    def __eq__(self, o: Any) -> bool:
+        if not isinstance(o, FeedContent):
+            return NotImplemented
+        return all(getattr(self, f.name) == getattr(o, f.name) for f in fields(FeedContent))
+
+    __hash__ = FeedContent.__hash__
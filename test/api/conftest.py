@@ -1,6 +1,7 @@
 import io
 from contextlib import suppress
 from os import environ
+from unittest.mock import MagicMock
 
 import pytest
 import pytest_asyncio
@@ -9,6 +10,8 @@ from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from qqqr.utils.net import ClientAdapter
 
+from aioqzone_feed.api import FeedApi
+
 loginman_list = ["up"]
 if environ.get("CI") is None:
     loginman_list.append("qr")
@@ -50,3 +53,11 @@ async def man(request, client: ClientAdapter, env: test_env):
             )
 
         return man
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def fake_api(client: ClientAdapter):
+    """A :class:`FeedApi` without login. Patch its request methods before use."""
+    api = FeedApi(client, MagicMock())
+    yield api
+    api.stop()
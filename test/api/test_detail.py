@@ -0,0 +1,224 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from aioqzone_feed.api import FeedApi
+from aioqzone_feed.api.detail import DetailCache, DetailPool
+from aioqzone_feed.api.flight import SingleFlight
+from aioqzone_feed.rule import DropRules
+
+asyncio_mark = pytest.mark.asyncio(loop_scope="module")
+
+
+@asyncio_mark
+async def test_detail_pool_limit(fake_api: FeedApi, fake_feed, fake_page):
+    inflight = peak = 0
+
+    async def shuoshuo(fid, uin, appid):
+        nonlocal inflight, peak
+        inflight += 1
+        peak = max(peak, inflight)
+        await asyncio.sleep(0.01)
+        inflight -= 1
+        return fake_feed(int(fid[-8:], 16), uin)
+
+    feeds = [fake_feed(i, hasmore=True, fid=f"{i:024x}") for i in range(100, 90, -1)]
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.detail_pool = DetailPool(max_inflight=2, max_queue=5)
+
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=fake_page(feeds)),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        assert await fake_api.get_feeds_by_count(10) == 10
+        await fake_api.wait()
+
+    assert peak == 2
+    # 7 feeds are queued, 3 feeds are emitted from summary
+    assert len(batch) == 10
+    assert fake_api.detail_pool.pending == 0
+
+
+@asyncio_mark
+async def test_detail_timeout(fake_api: FeedApi, fake_feed, fake_page):
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(10)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.detail_pool = DetailPool(timeout=0.05)
+
+    with (
+        patch.object(
+            fake_api, "get_feedpage_by_uin", return_value=fake_page([fake_feed(100, hasmore=True)])
+        ),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        await fake_api.get_feeds_by_count(1)
+        await asyncio.wait_for(fake_api.wait(), 1)
+
+    assert len(batch) == 1
+    assert batch[0].abstime == 100
+
+
+def test_detail_cache():
+    cache = DetailCache(maxsize=2, ttl=60)
+    cache.put(("a", 1, 311), "A", (0, 0))
+    cache.put(("b", 1, 311), "B", (0, 0))
+    assert cache.get(("a", 1, 311), (0, 0)) == "A"
+    cache.put(("c", 1, 311), "C", (0, 0))
+    # b is the least recently used
+    assert cache.get(("b", 1, 311), (0, 0)) is None
+    # fingerprint changes
+    assert cache.get(("a", 1, 311), (1, 0)) is None
+    assert cache.get(("a", 1, 311), (0, 0)) is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    cache.ttl = -1
+    cache.put(("d", 1, 311), "D")
+    assert cache.get(("d", 1, 311)) is None
+
+
+@asyncio_mark
+async def test_detail_cached(fake_api: FeedApi, fake_feed, fake_page):
+    calls = []
+
+    async def shuoshuo(fid, uin, appid):
+        calls.append(fid)
+        return fake_feed(100)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.detail_cache = cache = DetailCache()
+
+    pages = [
+        fake_page([fake_feed(100, hasmore=True)]),
+        fake_page([fake_feed(100, hasmore=True)]),
+        fake_page([fake_feed(100, hasmore=True, comment=dict(num=1))]),
+    ]
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=pages),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        for _ in pages:
+            await fake_api.get_feeds_by_count(1)
+            await fake_api.wait()
+
+    assert len(batch) == 3
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@asyncio_mark
+async def test_detail_coalesced(fake_api: FeedApi, fake_feed, fake_page):
+    calls = []
+
+    async def shuoshuo(fid, uin, appid):
+        calls.append(fid)
+        await asyncio.sleep(0.01)
+        return fake_feed(100)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    page = fake_page([fake_feed(100, hasmore=True)])
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        await asyncio.gather(fake_api.get_feeds_by_count(1), fake_api.get_feeds_by_count(1))
+        await fake_api.wait()
+
+    assert len(calls) == 1
+    assert len(batch) == 2
+    assert fake_api.detail_flight.coalesced == 1
+    assert fake_api.detail_pool.pending == 0
+
+
+@asyncio_mark
+async def test_singleflight_cancel():
+    flight: SingleFlight[int] = SingleFlight()
+    started = []
+
+    async def request():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return 1
+
+    a = asyncio.ensure_future(flight.do("k", request))
+    b = asyncio.ensure_future(flight.do("k", request))
+    await asyncio.sleep(0)
+    a.cancel()
+    # another caller is still waiting, so the request goes on
+    assert await b == 1
+    assert started == [1] and flight.coalesced == 1
+
+    c = asyncio.ensure_future(flight.do("k", request))
+    await asyncio.sleep(0)
+    c.cancel()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    # the only caller is cancelled, so is the request
+    assert "k" not in flight
+
+    fut = flight.submit("j", lambda: asyncio.ensure_future(request()))
+    assert fut is not None
+    flight.join(fut)
+    flight.join(fut)
+    flight.leave(fut)
+    await asyncio.sleep(0)
+    assert not fut.done()
+    # the request is cancelled once no caller waits on it
+    flight.leave(fut)
+    await asyncio.sleep(0)
+    assert fut.cancelled()
+
+
+@asyncio_mark
+async def test_detail_overflow_shared(fake_api: FeedApi, fake_feed, fake_page):
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(0.01)
+        return fake_feed(100, summary=dict(summary="detail", hasmore=False))
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append((bid, repr(feed.entities))))
+    fake_api._ch_feed_dispatch.maxsize = 1
+    fake_api._ch_feed_dispatch.policy = "drop_oldest"
+    page = fake_page([fake_feed(100, hasmore=True)])
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        s1 = fake_api.start_feeds_by_count(1)
+        s2 = fake_api.start_feeds_by_count(1)
+        await s1.wait()
+        await s2.wait()
+
+    # the detail request is shared, only the wrapper of the first session is dropped
+    assert (s1.lost, s2.lost) == (1, 0)
+    assert len(batch) == 1
+    assert batch[0][0] == s2.bid and "detail" in batch[0][1]
+
+
+@asyncio_mark
+async def test_drop_by_detail(fake_api: FeedApi, fake_feed, fake_page):
+    async def shuoshuo(fid, uin, appid):
+        return fake_feed(100, summary=dict(summary="full text with a discount", hasmore=False))
+
+    batch, dropped = [], []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.feed_dropped.add_impl(lambda bid, feed: dropped.append(feed))
+    fake_api.drop_rules = DropRules(keywords=["discount"])
+    page = fake_page([fake_feed(100, hasmore=True), fake_feed(99, hasmore=True)])
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        fake_api.emit_order = "page"
+        session = fake_api.start_feeds_by_count(2)
+        assert await session.wait() == 2
+
+    # keywords only in the detail are checked as well
+    assert not batch and len(dropped) == 2
+    assert (session.emitted, session.dropped, session.pending) == (0, 2, 0)
@@ -0,0 +1,610 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from aioqzone_feed.api import CrawlReport, DetailPool, FeedApi
+from aioqzone_feed.metrics import Metrics
+from aioqzone_feed.store import MemorySeenStore
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+def paged(fake_feed, fake_page, n_page: int, page_size: int = 5, start: int = 10000):
+    """Return a fake :meth:`FeedApi.get_feedpage_by_uin` and the list of requested pages."""
+    requested = []
+
+    async def get_feedpage_by_uin(uin=None, attach_info=None):
+        p = int(attach_info or 0)
+        requested.append(p)
+        feeds = [fake_feed(start - p * page_size - i, uin or 1) for i in range(page_size)]
+        return fake_page(feeds, hasmore=p + 1 < n_page, attachinfo=str(p + 1))
+
+    return get_feedpage_by_uin, requested
+
+
+async def test_iter_feeds(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 10)
+    got = []
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        async for feed in fake_api.iter_feeds(by_second=1e4, start=10000, buffer=5):
+            got.append(feed)
+            if len(got) == 5:
+                # the consumer is slow, no more pages should be requested
+                await asyncio.sleep(0.01)
+                assert len(requested) <= 2
+
+    assert len(got) == 50
+    assert got == sorted(got, reverse=True)
+    assert not fake_api.feed_processed.impls
+
+
+async def test_iter_feeds_break(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 10)
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        it = fake_api.iter_feeds(by_second=1e4, start=10000, buffer=5)
+        async for _ in it:
+            break
+        await it.aclose()
+
+    assert len(requested) <= 2
+    assert not fake_api.feed_processed.impls
+
+
+async def test_prefetch(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 10)
+    overlapped = []
+
+    async def stop_fetch(feed):
+        await asyncio.sleep(0)
+        overlapped.append(len(requested))
+        return False
+
+    fake_api.prefetch = 2
+    fake_api.stop_fetch.add_impl(stop_fetch)
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        assert await fake_api.get_feeds_by_count(7) == 7
+        n_requested = len(requested)
+        await asyncio.sleep(0.01)
+
+    # next pages are requested while the first page is being processed
+    assert overlapped[4] == 3
+    # pages requested ahead are discarded
+    assert n_requested == len(requested) <= 4
+    assert requested == list(range(n_requested))
+
+
+async def test_by_uins(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 3)
+    inflight = peak = 0
+
+    async def get_feedpage_by_uin(uin=None, attach_info=None):
+        nonlocal inflight, peak
+        if uin == 4:
+            raise RuntimeError("fake error")
+        inflight += 1
+        peak = max(peak, inflight)
+        await asyncio.sleep(0.01)
+        inflight -= 1
+        return await get_page(uin, attach_info)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_feedpage_by_uin):
+        counts = await fake_api.get_feeds_by_uins(
+            [1, 2, 3, 2, 4], 1e4, start=10000, max_per_uin=12, max_concurrency=2
+        )
+        await fake_api.wait()
+
+    assert counts == {1: 12, 2: 12, 3: 12}
+    assert peak == 2
+    assert {i.uin for i in batch} == {1, 2, 3}
+    assert len(batch) == 36
+
+
+async def test_iter_feeds_concurrent(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 10)
+    got, other = [], []
+    fake_api.feed_processed.add_impl(lambda bid, feed: other.append(feed))
+
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        async for feed in fake_api.iter_feeds(by_count=10, buffer=5):
+            got.append(feed)
+            if len(got) == 1:
+                # shares the batch id of the iterator
+                assert await fake_api.get_feeds_by_count(5, uin=2) == 5
+            await asyncio.sleep(0)
+        await fake_api.wait()
+
+    assert len(got) == 10
+    assert {i.uin for i in got} == {1}
+    assert len([i for i in other if i.uin == 2]) == 5
+
+
+async def test_new_feeds(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 10)
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.seen_store = MemorySeenStore()
+
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page),
+        patch("time.time", return_value=10000),
+    ):
+        assert await fake_api.get_new_feeds(seconds=12) == 13
+        assert fake_api.seen_store.watermark(0) == 10000
+        assert await fake_api.get_new_feeds() == 0
+        assert len(requested) == 4
+
+        # the same feeds are skipped once they are seen
+        assert await fake_api.get_feeds_by_second(20, start=10000) == 8
+        await fake_api.wait()
+
+    assert len(batch) == 21
+    assert len(set(batch)) == 21
+
+    # a feed posted in the same second as the watermark, after the last crawl
+    page = fake_page([fake_feed(10000, uin=2), fake_feed(10000), fake_feed(9999)])
+    with patch.object(fake_api, "get_feedpage_by_uin", return_value=page):
+        assert await fake_api.get_new_feeds() == 1
+
+
+async def test_new_feeds_private_store(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 10)
+
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page),
+        patch("time.time", return_value=10000),
+    ):
+        assert await fake_api.get_new_feeds(seconds=12) == 13
+        assert await fake_api.get_new_feeds() == 0
+        # other crawls are not affected by the store of get_new_feeds
+        assert fake_api.seen_store is None
+        assert await fake_api.get_feeds_by_second(20, start=10000) == 21
+        await fake_api.wait()
+
+
+async def test_checkpoint(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 10)
+
+    async def flaky_page(uin=None, attach_info=None):
+        if attach_info == "3" and requested.count(3) == 0:
+            requested.append(3)
+            raise RuntimeError("fake error")
+        return await get_page(uin, attach_info)
+
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=flaky_page):
+        with pytest.raises(RuntimeError):
+            await fake_api.get_feeds_by_second(40, start=10000, checkpoint="backfill")
+        assert fake_api.checkpoint_store
+        cp = fake_api.checkpoint_store.get("backfill")
+        assert cp and cp.attach_info == "3" and cp.cnt_got == 15
+
+        assert await fake_api.get_feeds_by_second(40, start=10000, checkpoint="backfill") == 41
+        assert fake_api.checkpoint_store.get("backfill") is None
+
+    assert requested == [0, 1, 2, 3, 3, 4, 5, 6, 7, 8]
+
+
+async def test_stop_fetch_page(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 10)
+    pages = []
+
+    def stop_at_abstime(feeds):
+        pages.append(len(feeds))
+        for i, fd in enumerate(feeds):
+            if fd.abstime <= 9988:
+                return i
+
+    fake_api.stop_fetch_page.add_impl(stop_at_abstime)
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        assert await fake_api.get_feeds_by_second(1e4, start=10000) == 12
+
+    assert pages == [5, 5, 5]
+    assert requested == [0, 1, 2]
+
+
+async def test_drop_before_detail(fake_api: FeedApi, fake_feed, fake_page):
+    feeds = [fake_feed(100, uin=20050606, hasmore=True), fake_feed(99)]
+    dropped = []
+    fake_api.feed_dropped.add_impl(lambda bid, feed: dropped.append(feed))
+
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=fake_page(feeds)),
+        patch.object(fake_api, "shuoshuo") as shuoshuo,
+    ):
+        assert await fake_api.get_feeds_by_count(2) == 2
+        await fake_api.wait()
+
+    shuoshuo.assert_not_called()
+    assert [i.uin for i in dropped] == [20050606]
+    assert fake_api.drop_rules.hits[("uin", 20050606)] == 1
+
+
+async def test_metrics(fake_api: FeedApi, fake_feed, fake_page):
+    feeds = [fake_feed(100, uin=20050606), fake_feed(99, hasmore=True), fake_feed(98)]
+    fake_api.metrics = m = Metrics()
+
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=fake_page(feeds)),
+        patch.object(fake_api, "shuoshuo", return_value=fake_feed(99)),
+    ):
+        assert await fake_api.get_feeds_by_count(3) == 3
+        await fake_api.wait()
+
+    assert m.counters == dict(
+        pages=1, feeds=3, feeds_dropped=1, detail_requests=1, feeds_emitted=2
+    )
+    assert m.histograms["hook_seconds"].count == 2
+    assert m.gauges["detail_pending"] == 0
+    assert m.gauges["dispatch_pending"] == 0
+
+
+async def test_batch_emit(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 3)
+    batches, dropped = [], []
+    fake_api.feeds_processed.add_impl(lambda bid, feeds: batches.append(len(feeds)))
+    fake_api.feeds_dropped.add_impl(lambda bid, feeds: dropped.append(len(feeds)))
+    fake_api.emit_batch_size = 5
+
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        assert await fake_api.get_feeds_by_second(11, start=10000) == 12
+        await fake_api.wait()
+    assert batches == [5, 5, 2]
+
+    # flushed by time, and dropped feeds are batched as well
+    fake_api.emit_batch_delay = 0.01
+    feeds = [fake_feed(100, uin=20050606), fake_feed(99), fake_feed(98)]
+    with patch.object(fake_api, "get_feedpage_by_uin", return_value=fake_page(feeds)):
+        fake_api.new_batch()
+        assert await fake_api.get_feeds_by_count(3) == 3
+        await asyncio.sleep(0.05)
+    assert batches == [5, 5, 2, 2]
+    assert dropped == [1]
+
+
+@pytest.mark.parametrize("order", ["page", "abstime"])
+async def test_ordered_emit(fake_api: FeedApi, fake_feed, fake_page, order):
+    async def shuoshuo(fid, uin, appid):
+        abstime = int(fid[-8:], 16)
+        await asyncio.sleep(0.001 * (abstime % 4))
+        return fake_feed(abstime, uin)
+
+    # the second page has a newer feed than the first one
+    pages = [
+        fake_page([fake_feed(i, hasmore=True, fid=f"{i:024x}") for i in range(100, 90, -1)], True),
+        fake_page([fake_feed(i, fid=f"{i:024x}") for i in (89, 101, 88)]),
+    ]
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed.abstime))
+    fake_api.emit_order = order
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=pages),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        session = fake_api.start_feeds_by_second(1e4, start=1000)
+        assert await session.wait() == 13
+
+    if order == "page":
+        assert batch == [*range(100, 90, -1), 89, 101, 88]
+    else:
+        # 101 overtakes the first page, which is still waiting for details
+        assert batch == sorted(batch, reverse=True)
+    assert session.reorder and session.reorder.pending == 0
+
+
+async def test_ordered_timeout(fake_api: FeedApi, fake_feed, fake_page):
+    async def shuoshuo(fid, uin, appid):
+        if fid.endswith("64"):
+            await asyncio.sleep(0.1)
+        return fake_feed(int(fid[-8:], 16), uin)
+
+    feeds = [fake_feed(i, hasmore=True, fid=f"{i:024x}") for i in range(100, 95, -1)]
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed.abstime))
+    fake_api.emit_order = "page"
+    fake_api.reorder_timeout = 0.02
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=fake_page(feeds)),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        session = fake_api.start_feeds_by_count(5)
+        await asyncio.sleep(0.05)
+        # the slow head is given up, feeds after it are not blocked
+        assert batch == [99, 98, 97, 96]
+        assert await session.wait() == 5
+
+    assert batch == [99, 98, 97, 96, 100]
+    assert session.reorder and session.reorder.expired == 1
+
+
+async def test_ordered_sessions(fake_api: FeedApi, fake_feed, fake_page):
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(0.1)
+        return fake_feed(100, uin)
+
+    async def get_page(uin=None, attach_info=None):
+        return fake_page([fake_feed(100, uin, hasmore=uin == 1)])
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed.uin))
+    fake_api.emit_order = "page"
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        s1 = fake_api.start_feeds_by_count(1, uin=1)
+        s2 = fake_api.start_feeds_by_count(1, uin=2)
+        # the slow detail of s1 does not block s2
+        await asyncio.wait_for(s2.wait(), 0.05)
+        assert batch == [2]
+        await s1.wait()
+
+    assert batch == [2, 1]
+
+
+async def test_batch_sessions(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 2)
+
+    async def slow_page(uin=None, attach_info=None):
+        await asyncio.sleep(0.001)
+        return await get_page(uin, attach_info)
+
+    batches = []
+    fake_api.feeds_processed.add_impl(lambda bid, feeds: batches.append((bid, len(feeds))))
+    fake_api.emit_batch_size = 10
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=slow_page):
+        s1 = fake_api.start_feeds_by_second(1e4, uin=1, start=10000)
+        s2 = fake_api.start_feeds_by_second(1e4, uin=2, start=10000)
+        await asyncio.gather(s1.wait(), s2.wait())
+
+    # interleaved sessions do not split batches of each other
+    assert sorted(batches) == sorted([(s1.bid, 10), (s2.bid, 10)])
+
+
+async def test_page_coalesced(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 2)
+
+    async def slow_page(uin=None, attach_info=None):
+        await asyncio.sleep(0.01)
+        return await get_page(uin, attach_info)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.metrics = m = Metrics()
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=slow_page):
+        # e.g. a heartbeat fetch and a crawl started by the user
+        assert await asyncio.gather(
+            fake_api.get_feeds_by_second(1e4, start=10000),
+            fake_api.get_feeds_by_second(1e4, start=10000),
+        ) == [10, 10]
+        await fake_api.wait()
+
+    assert requested == [0, 1]
+    assert m.counters["pages"] == 2
+    assert m.counters["page_coalesced"] == 2
+    assert len(batch) == 20
+    assert not len(fake_api.page_flight)
+
+
+async def test_sessions(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 2)
+
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(0.01 if uin == 1 else 0)
+        return fake_feed(100, uin)
+
+    async def slow_page(uin=None, attach_info=None):
+        await asyncio.sleep(0.001)
+        page = await get_page(uin, attach_info)
+        for feed in page.vFeeds:
+            feed.summary.hasmore = True
+        return page
+
+    tagged = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: tagged.append((bid, feed.uin)))
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=slow_page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        s1 = fake_api.start_feeds_by_second(1e4, uin=1, start=10000)
+        s2 = fake_api.start_feeds_by_second(1e4, uin=2, start=10000)
+        assert s1.bid != s2.bid
+        # the fast session finishes without waiting for the slow one
+        assert await s2.wait() == 10
+        assert not s1.done()
+        assert await s1.wait() == 10
+
+    assert (s1.got, s1.emitted, s1.pending) == (10, 10, 0)
+    assert sorted(set(tagged)) == sorted([(s1.bid, 1), (s2.bid, 2)])
+
+
+async def test_session_cancel(fake_api: FeedApi, fake_feed, fake_page):
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(0.01)
+        return fake_feed(100)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    page = fake_page([fake_feed(100, hasmore=True), fake_feed(99)])
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        session = fake_api.start_feeds_by_count(2)
+        await asyncio.sleep(0.005)
+        assert session.got == 2 and session.pending == 1
+        session.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await session.wait()
+        await fake_api.wait()
+
+    # the feed waiting for details is discarded
+    assert [i.abstime for i in batch] == [99]
+    assert session.emitted == 1
+
+
+@pytest.mark.parametrize("policy", ["block", "drop_notice"])
+async def test_bounded_notify(fake_api: FeedApi, fake_feed, fake_page, policy):
+    get_page, _ = paged(fake_feed, fake_page, 4)
+    batch, notices = [], []
+    peak = 0
+
+    async def slow_sink(bid, feed):
+        nonlocal peak
+        peak = max(peak, fake_api.ch_feed_notify.depth)
+        await asyncio.sleep(0.001)
+        batch.append(feed.abstime)
+
+    fake_api.feed_processed.add_impl(slow_sink)
+    fake_api.feed_overflowed.add_impl(lambda bid, feed: notices.append(feed.abstime))
+    fake_api.ch_feed_notify.maxsize = 3
+    fake_api.ch_feed_notify.policy = policy
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        assert await fake_api.get_feeds_by_second(1e4, start=10000) == 20
+        await fake_api.wait()
+
+    assert peak <= 3
+    if policy == "block":
+        assert len(batch) == 20 and not notices
+    else:
+        assert fake_api.ch_feed_notify.dropped == len(notices) > 0
+        assert sorted(batch + notices) == list(range(9981, 10001))
+
+
+async def test_bounded_batch_notify(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 4)
+    batch, notices = [], []
+
+    async def slow_sink(bid, feeds):
+        await asyncio.sleep(0.001)
+        batch.extend(i.abstime for i in feeds)
+
+    fake_api.feeds_processed.add_impl(slow_sink)
+    fake_api.feed_overflowed.add_impl(lambda bid, feed: notices.append(feed.abstime))
+    fake_api.emit_batch_size = 2
+    fake_api.ch_feed_notify.maxsize = 1
+    fake_api.ch_feed_notify.policy = "drop_notice"
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        session = fake_api.start_feeds_by_second(1e4, start=10000)
+        assert await session.wait() == 20
+        await fake_api.wait()
+
+    # each feed of a dropped batch gets a notice, and is counted as lost
+    assert 0 < fake_api.ch_feed_notify.dropped
+    assert session.lost == len(notices) == 2 * fake_api.ch_feed_notify.dropped
+    assert sorted(batch + notices) == list(range(9981, 10001))
+
+
+async def test_deadline(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, requested = paged(fake_feed, fake_page, 20)
+
+    async def slow_page(uin=None, attach_info=None):
+        await asyncio.sleep(0.02)
+        page = await get_page(uin, attach_info)
+        for feed in page.vFeeds:
+            feed.summary.hasmore = True
+        return page
+
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(10)
+
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed))
+    fake_api.deadline_margin = 0.05
+    loop = asyncio.get_running_loop()
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=slow_page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        start = loop.time()
+        report = await fake_api.get_feeds_report(0.2, by_second=1e5, start=10000, checkpoint="a")
+        assert loop.time() - start < 0.3
+
+    assert report.cut_off
+    assert 0 < report.got < 100
+    # feeds waiting for details are emitted from summaries
+    assert report.summarized == report.emitted == report.got == len(batch)
+    assert not report.unemitted
+    assert fake_api.checkpoint_store and fake_api.checkpoint_store.get("a")
+
+
+async def test_deadline_cancel_details(fake_api: FeedApi, fake_feed, fake_page):
+    page = fake_page([fake_feed(i, hasmore=True, fid=f"{i:024x}") for i in range(100, 90, -1)])
+    started = []
+
+    async def shuoshuo(fid, uin, appid):
+        started.append(loop.time())
+        await asyncio.sleep(0.1)
+        return fake_feed(int(fid, 16), uin)
+
+    fake_api.detail_pool = DetailPool(max_inflight=1)
+    fake_api.deadline_margin = 0.05
+    loop = asyncio.get_running_loop()
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", return_value=page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        start = loop.time()
+        report = await fake_api.get_feeds_report(0.25, by_count=10)
+        end = loop.time()
+        # queued detail requests are cancelled, so nothing keeps the api busy
+        await asyncio.wait_for(fake_api.wait(), 0.1)
+
+    assert report.emitted == report.got == 10
+    assert 0 < report.summarized < 10
+    assert started and all(i < end for i in started)
+    assert end - start < 0.3
+    assert fake_api.detail_pool.pending == 0
+
+
+async def test_deadline_in_time(fake_api: FeedApi, fake_feed, fake_page):
+    get_page, _ = paged(fake_feed, fake_page, 2)
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=get_page):
+        report = await fake_api.get_feeds_report(1, by_count=5)
+        assert await fake_api.get_feeds_report(1, by_count=0) == CrawlReport(0, 0, 0)
+        assert await fake_api.get_feeds_by_count(5, deadline=1) == 5
+
+    assert not report.cut_off
+    assert (report.got, report.emitted, report.summarized, report.late) == (5, 5, 0, 0)
+
+
+@pytest.mark.parametrize("policy", ["block", "drop_oldest", "drop_notice"])
+async def test_iter_feeds_bounded(fake_api: FeedApi, fake_feed, fake_page, policy):
+    get_page, _ = paged(fake_feed, fake_page, 4)
+
+    async def detail_page(uin=None, attach_info=None):
+        page = await get_page(uin, attach_info)
+        for feed in page.vFeeds:
+            feed.summary.hasmore = True
+        return page
+
+    async def shuoshuo(fid, uin, appid):
+        await asyncio.sleep(0.001)
+        return fake_feed(int(fid[-8:], 16), uin)
+
+    async def slow_sink(bid, feed):
+        await asyncio.sleep(0.001)
+
+    fake_api.feed_processed.add_impl(slow_sink)
+    for ch in fake_api.ch_feed_notify, fake_api._ch_feed_dispatch:
+        ch.maxsize = 2
+        ch.policy = policy
+    got = []
+    with (
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=detail_page),
+        patch.object(fake_api, "shuoshuo", side_effect=shuoshuo),
+    ):
+        it = fake_api.iter_feeds(by_second=1e4, start=10000, buffer=3)
+        await asyncio.wait_for(_collect(it, got), 1)
+
+    # emissions of iter_feeds are not dropped, feeds whose details are dropped are not yielded
+    assert fake_api.ch_feed_notify.dropped == 0
+    dropped = fake_api._ch_feed_dispatch.dropped
+    assert len(got) + dropped == 20
+    assert (dropped == 0) == (policy == "block")
+
+
+async def _collect(it, got: list):
+    async for feed in it:
+        got.append(feed)
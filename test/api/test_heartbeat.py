@@ -1,3 +1,4 @@
+import asyncio
 from typing import Type, cast
 from unittest.mock import patch
 
@@ -5,6 +6,7 @@ import pytest
 import pytest_asyncio
 from aiohttp import ClientResponseError, RequestInfo
 from aioqzone.api import Loginable
+from aioqzone.model.api.response import FeedCount
 from multidict import CIMultiDictProxy
 from qqqr.exception import UserBreak
 from qqqr.utils.net import ClientAdapter
@@ -12,6 +14,9 @@ from tenacity import Future, RetryError
 from yarl import URL
 
 from aioqzone_feed.api import FeedApi
+from aioqzone_feed.api.heartbeat import HeartbeatScheduler
+from aioqzone_feed.metrics import Metrics
+from aioqzone_feed.store import MemorySeenStore
 
 pytestmark = pytest.mark.asyncio(scope="module")
 
@@ -45,3 +50,85 @@ async def test_heartbeat_exc(api: FeedApi, exc2r: Type[BaseException]):
         await api.heartbeat_refresh()
         await api.ch_heartbeat_notify.wait()
         assert pool
+
+
+async def test_scheduler_interval(fake_api: FeedApi):
+    sched = HeartbeatScheduler(fake_api, min_interval=5, max_interval=100, interval=10)
+    sched.update(0)
+    assert sched.interval == 15
+    sched.update(3)
+    assert sched.interval == 7.5
+    # polls faster than the initial interval while new feeds keep arriving
+    sched.update(4)
+    assert sched.interval == 5
+    sched.update(4)
+    assert sched.interval == 7.5
+    sched.interval = 10
+    sched.update(ClientResponseError(_fake_request, (), status=500))
+    assert sched.interval == 30
+    sched.update(ClientResponseError(_fake_request, (), status=500))
+    sched.update(ClientResponseError(_fake_request, (), status=500))
+    assert sched.interval == 100
+    assert sched.stats.failed == sched.stats.consecutive_failures == 3
+    assert sched.stats.refreshed == 3
+
+
+async def test_scheduler_run(fake_api: FeedApi):
+    fake_api.hb_scheduler = sched = HeartbeatScheduler(
+        fake_api, min_interval=0.01, max_interval=0.01, jitter=0
+    )
+    with patch.object(fake_api, "mfeeds_get_count", return_value=FeedCount(active_cnt=1)):
+        sched.start()
+        await asyncio.sleep(0.1)
+        assert sched.running
+        fake_api.stop()
+        assert not sched.running
+
+    assert sched.stats.succeeded >= 2
+    assert sched.stats.last_cnt == 1
+
+
+async def test_fetch_on_heartbeat(fake_api: FeedApi, fake_feed, fake_page):
+    pages = [
+        fake_page([fake_feed(i) for i in range(1000, 995, -1)], True, "1"),
+        fake_page([fake_feed(i) for i in range(995, 990, -1)], False, "2"),
+        fake_page([fake_feed(i) for i in range(1001, 996, -1)], True, "1"),
+    ]
+    batch = []
+    fake_api.feed_processed.add_impl(lambda bid, feed: batch.append(feed.abstime))
+    fake_api.fetch_on_heartbeat = True
+    fake_api.seen_store = MemorySeenStore()
+
+    with (
+        patch.object(
+            fake_api,
+            "mfeeds_get_count",
+            side_effect=[FeedCount(active_cnt=7), FeedCount(active_cnt=1)],
+        ),
+        patch.object(fake_api, "get_feedpage_by_uin", side_effect=pages) as get_page,
+        patch("time.time", return_value=1000),
+    ):
+        await fake_api.heartbeat_refresh()
+        await fake_api.ch_heartbeat_notify.wait()
+        await fake_api.wait()
+        assert batch == list(range(1000, 993, -1))
+        assert fake_api.seen_store.watermark(0) == 1000
+
+        await fake_api.heartbeat_refresh()
+        await fake_api.ch_heartbeat_notify.wait()
+        await fake_api.wait()
+
+    assert get_page.call_count == 3
+    assert batch[7:] == [1001]
+
+
+async def test_heartbeat_metrics(fake_api: FeedApi):
+    fake_api.metrics = m = Metrics()
+    results = [FeedCount(active_cnt=2), ClientResponseError(_fake_request, (), status=500)]
+    with patch.object(fake_api, "mfeeds_get_count", side_effect=results):
+        assert await fake_api.heartbeat_refresh() == 2
+        assert isinstance(await fake_api.heartbeat_refresh(), ClientResponseError)
+
+    assert m.counters == dict(heartbeat_succeeded=1, heartbeat_failed=1)
+    assert m.gauges["heartbeat_active_cnt"] == 2
+    assert m.histograms["heartbeat_seconds"].count == 2
@@ -0,0 +1,103 @@
+import asyncio
+from typing import cast
+from unittest.mock import patch
+
+import pytest
+from aiohttp import ClientResponseError, RequestInfo, ServerTimeoutError
+from multidict import CIMultiDictProxy
+from yarl import URL
+
+from aioqzone_feed.api import AdaptiveLimiter, FeedApi
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+_fake_request = RequestInfo(
+    URL("https://h5.qzone.qq.com/webapp/json/mqzone_feeds/getActiveFeeds"),
+    "GET",
+    cast(CIMultiDictProxy, ...),
+    URL(),
+)
+
+
+async def request(lim: AdaptiveLimiter, exc=None, delay=0.0):
+    async with lim.slot():
+        await asyncio.sleep(delay)
+        if exc:
+            raise exc
+
+
+async def test_concurrency():
+    lim = AdaptiveLimiter(limit=2, increase=0)
+    inflight = peak = 0
+
+    async def req():
+        nonlocal inflight, peak
+        async with lim.slot():
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.005)
+            inflight -= 1
+
+    await asyncio.gather(*(req() for _ in range(6)))
+    assert peak == 2
+    assert lim.inflight == lim.waiting == 0
+
+
+async def test_cancel_waiting():
+    lim = AdaptiveLimiter(limit=1, increase=0)
+    async with lim.slot():
+        first, second, third = (asyncio.ensure_future(lim.slot().__aenter__()) for _ in "123")
+        await asyncio.sleep(0)
+        assert lim.waiting == 3
+        # cancelled right before the slot is released, so it is skipped
+        first.cancel()
+    await second
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert lim.inflight == 1 and lim.waiting == 1
+    third.cancel()
+
+
+async def test_aimd():
+    lim = AdaptiveLimiter(limit=4)
+    busy = ClientResponseError(_fake_request, (), status=500)
+    results = await asyncio.gather(
+        *(request(lim, busy, 0.001) for _ in range(4)), return_exceptions=True
+    )
+    assert all(isinstance(r, ClientResponseError) for r in results)
+    # failures of the same round decrease the limit once
+    assert lim.busy == 4
+    assert lim.limit == 2
+
+    with pytest.raises(ServerTimeoutError):
+        await request(lim, ServerTimeoutError())
+    assert lim.limit == 1
+
+    # other errors do not change the limit
+    with pytest.raises(ValueError):
+        await request(lim, ValueError())
+    assert lim.limit == 1
+
+    for _ in range(5):
+        await request(lim)
+    assert 2 < lim.limit < 4
+
+
+async def test_rate():
+    lim = AdaptiveLimiter(rate=200, burst=1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(request(lim) for _ in range(5)))
+    assert loop.time() - start >= 0.015
+
+
+async def test_api_limited(fake_api: FeedApi, fake_feed, fake_page):
+    fake_api.limiter = lim = AdaptiveLimiter(limit=4)
+    pages = [ClientResponseError(_fake_request, (), status=500), fake_page([fake_feed(100)])]
+    with patch.object(fake_api, "get_feedpage_by_uin", side_effect=pages):
+        with pytest.raises(ClientResponseError):
+            await fake_api.get_feeds_by_count(1)
+        assert await fake_api.get_feeds_by_count(1) == 1
+
+    assert lim.busy == 1
+    assert lim.limit == 2.5
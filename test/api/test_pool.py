@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from aioqzone.exception import QzoneError
+from aioqzone.model.api.response import FeedCount
+from qqqr.utils.net import ClientAdapter
+
+from aioqzone_feed.api import FeedApiPool
+from aioqzone_feed.api.pool import FairGate
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+def login(uin: int):
+    man = MagicMock()
+    man.uin = uin
+    return man
+
+
+async def test_fair_gate():
+    gate = FairGate(1)
+    order = []
+
+    async def request(key, i):
+        async with gate.slot(key):
+            order.append((key, i))
+            await asyncio.sleep(0.001)
+
+    # account 1 floods the gate before account 2 comes
+    tasks = [asyncio.ensure_future(request(1, i)) for i in range(4)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(request(2, 0)))
+    await asyncio.gather(*tasks)
+
+    assert order == [(1, 0), (1, 1), (2, 0), (1, 2), (1, 3)]
+    assert gate.inflight == 0 and gate.waiting == 0
+
+
+async def test_gate_cancel():
+    gate = FairGate(1)
+    async with gate.slot(1):
+        waiter = asyncio.ensure_future(gate.slot(2).__aenter__())
+        await asyncio.sleep(0)
+        assert gate.waiting == 1
+        waiter.cancel()
+        await asyncio.sleep(0)
+        assert gate.waiting == 0
+    assert gate.inflight == 0
+
+    # a waiter cancelled right before the slot is released is skipped
+    async with gate.slot(1):
+        first, second, third = (asyncio.ensure_future(gate.slot(2).__aenter__()) for _ in "123")
+        await asyncio.sleep(0)
+        first.cancel()
+    await second
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert gate.inflight == 1 and gate.waiting == 1
+    third.cancel()
+
+
+async def test_pool_isolation(client: ClientAdapter, fake_feed, fake_page):
+    pool = FeedApiPool(client, suspend=60)
+    ok, expired = pool.add(login(1)), pool.add(login(2))
+
+    with (
+        patch.object(
+            ok, "get_feedpage_by_uin", return_value=fake_page([fake_feed(100), fake_feed(99)])
+        ),
+        patch.object(expired, "get_feedpage_by_uin", side_effect=QzoneError(-3000)),
+    ):
+        results = await pool.get_feeds_by_second(1e4, start=100)
+        await pool.wait()
+
+    assert results[1] == 2
+    assert isinstance(results[2], QzoneError)
+    assert pool.stats[1].feeds == 2
+    assert pool.stats[2].login_expired == 1
+    assert pool.active() == [1]
+
+    with patch.object(ok, "mfeeds_get_count", return_value=FeedCount(active_cnt=3)):
+        assert await pool.heartbeat(1) == 3
+    assert pool.stats[1].heartbeats == 1
+
+    pool.resume(2)
+    assert pool.active() == [1, 2]
+    pool.stop()
@@ -0,0 +1,50 @@
+import pytest
+from aioqzone.model import FeedData
+from aioqzone.model.api.response import FeedPageResp
+
+
+def make_feed(abstime: int, uin: int = 1, *, fid: str = "", hasmore=False, appid=311, **kwds):
+    """Build a fake :class:`FeedData` for offline tests."""
+    fid = fid or f"{uin:x}{abstime:x}".rjust(24, "0")
+    url = f"http://user.qzone.qq.com/{uin}/mood/{fid}"
+    data = dict(
+        id=dict(cellid=fid),
+        comm=dict(
+            time=abstime,
+            appid=appid,
+            feedstype=0,
+            curlikekey=url,
+            orglikekey=url,
+            ugckey="",
+            ugcrightkey=fid,
+            right_info={},
+            wup_feeds_type=0,
+        ),
+        userinfo=dict(user=dict(uin=uin, nickname=f"user{uin}")),
+        summary=dict(summary=f"feed at {abstime}", hasmore=hasmore),
+    )
+    data.update(kwds)
+    return FeedData.model_validate(data)
+
+
+def make_page(feeds: list, hasmore=False, attachinfo=""):
+    """Build a fake :class:`FeedPageResp` for offline tests."""
+    return FeedPageResp.model_validate(
+        dict(
+            hasmore=hasmore,
+            attachinfo=attachinfo,
+            newcnt=0,
+            undeal_info={},
+            vFeeds=feeds,
+        )
+    )
+
+
+@pytest.fixture(scope="session")
+def fake_feed():
+    return make_feed
+
+
+@pytest.fixture(scope="session")
+def fake_page():
+    return make_page
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from aioqzone_feed.message import BoundedFutureStore
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+async def test_drop_oldest():
+    dropped = []
+    store = BoundedFutureStore(2, "drop_notice", on_drop=dropped.append)
+    futs = [store.add_awaitable(asyncio.sleep(0.01), i) for i in range(4)]
+    assert store.depth == 2 and store.dropped == 2
+    assert dropped == [0, 1]
+    await store.wait()
+    assert [f.cancelled() for f in futs] == [True, True, False, False]
+
+    # unbounded futures are not counted nor dropped
+    store.policy = "drop_oldest"
+    free = store.add_awaitable(asyncio.sleep(0.01), bounded=False)
+    for _ in range(3):
+        store.add_awaitable(asyncio.sleep(0.01))
+    assert store.depth == 2 and store.dropped == 3
+    await store.wait()
+    assert not free.cancelled()
+
+
+async def test_block():
+    store = BoundedFutureStore(2)
+    peak = 0
+
+    async def producer():
+        nonlocal peak
+        for _ in range(6):
+            await store.wait_room()
+            store.add_awaitable(asyncio.sleep(0.002))
+            peak = max(peak, store.depth)
+
+    await asyncio.wait_for(producer(), 1)
+    await store.wait()
+    assert peak == 2 and store.dropped == 0
+
+
+async def test_clear_wakes():
+    store = BoundedFutureStore(1)
+    store.add_awaitable(asyncio.sleep(10))
+    waiter = asyncio.ensure_future(store.wait_room())
+    await asyncio.sleep(0)
+    store.clear()
+    await asyncio.wait_for(waiter, 1)
+    assert store.depth == 0
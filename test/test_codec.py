@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from aioqzone_feed.codec import (
+    VERSION,
+    from_bytes,
+    from_bytes_batch,
+    from_compact,
+    to_bytes,
+    to_bytes_batch,
+    to_compact,
+)
+from aioqzone_feed.type import BaseFeed, FeedContent, LazyFeedContent, VisualMedia
+
+
+def content(fake_feed, abstime: int, **kwds):
+    raw = fake_feed(
+        abstime,
+        summary=dict(
+            summary="hi @{uin:2,nick:bob} [em]e100[/em] {url:https://example.com,text:x}"
+        ),
+        **kwds,
+    )
+    feed = FeedContent.from_feed(raw)
+    feed.set_detail(raw)
+    return feed
+
+
+def test_roundtrip(fake_feed):
+    media = VisualMedia(height=1, width=2, raw="r", is_video=True, thumbnail=None)
+    feed = content(fake_feed, 100)
+    feed.media = [media]
+    assert {type(e).__name__ for e in feed.entities} >= {"AtEntity", "EmEntity", "LinkEntity"}
+
+    feed.forward = content(fake_feed, 99)
+    shared = content(fake_feed, 98)
+    shared.forward = "http://user.qzone.qq.com/1/share"
+
+    for o in [media, BaseFeed(311, 0, "f", 1, 1, "n"), feed, shared]:
+        back = from_bytes(to_bytes(o))
+        assert type(back) is type(o)
+        assert back == o
+        assert from_compact(to_compact(o)) == o
+
+    back = from_bytes(to_bytes(feed))
+    assert isinstance(back, FeedContent) and isinstance(back.forward, FeedContent)
+    assert [type(e) for e in back.entities] == [type(e) for e in feed.entities]
+
+
+def test_lazy(fake_feed):
+    raw = fake_feed(100)
+    lazy = LazyFeedContent.from_feed(raw)
+    lazy.set_detail(raw)
+    back = from_bytes(to_bytes(lazy))
+    assert type(back) is FeedContent
+    assert back == lazy
+
+
+def test_batch(fake_feed):
+    feeds = [content(fake_feed, i) for i in range(10)]
+    assert from_bytes_batch(to_bytes_batch(feeds)) == feeds
+    assert from_bytes_batch(to_bytes_batch([])) == []
+
+
+def test_version(fake_feed):
+    data = json.loads(to_bytes(content(fake_feed, 1)))
+    assert data[0] == VERSION
+    data[0] = VERSION + 1
+    with pytest.raises(ValueError):
+        from_bytes(json.dumps(data))
+    with pytest.raises(TypeError):
+        to_compact("not a feed")  # type: ignore
@@ -0,0 +1,35 @@
+import asyncio
+
+from aioqzone_feed.metrics import Metrics, prometheus_text, timed
+
+
+def test_metrics():
+    records = []
+    m = Metrics(buckets=(0.1, 1), callback=lambda name, v: records.append(name))
+    m.inc("pages")
+    m.inc("pages", 2)
+    m.set("detail_pending", 4)
+    for v in (0.05, 0.5, 0.5, 5):
+        m.observe("page_seconds", v)
+
+    assert m.counters == {"pages": 3}
+    h = m.histograms["page_seconds"]
+    assert h.counts == [1, 2, 1]
+    assert h.quantile(0.5) == 1
+    assert h.quantile(0.99) == float("inf")
+    assert len(records) == 7
+
+    text = prometheus_text(m, prefix="feed")
+    assert "feed_pages_total 3" in text
+    assert "feed_detail_pending 4" in text
+    assert 'feed_page_seconds_bucket{le="1"} 3' in text
+    assert 'feed_page_seconds_bucket{le="+Inf"} 4' in text
+
+    m.reset()
+    assert not m.snapshot()
+
+
+def test_timed():
+    m = Metrics()
+    assert asyncio.run(timed(m, "sleep", asyncio.sleep(0.01, 1))) == 1
+    assert m.histograms["sleep"].sum >= 0.01
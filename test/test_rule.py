@@ -0,0 +1,42 @@
+from aioqzone_feed.rule import DropRules
+
+
+def test_rules(fake_feed):
+    rules = DropRules(
+        uins=range(100, 2000),
+        appids=[202],
+        fid_prefixes=["advertisement", "ad_", "adv"],
+        nicknames=["spam bot"],
+        keywords=["buy now", "discount"],
+    )
+    assert len(rules) == 1900 + 1 + 3 + 1 + 2
+
+    assert rules.match(fake_feed(1, uin=150)) == ("uin", 150)
+    assert rules.match(fake_feed(1, appid=202)) == ("appid", 202)
+    assert rules.match(fake_feed(1, fid="advertisement_1")) == ("fid_prefix", "adv")
+    assert rules.match(fake_feed(1, fid="ad_1")) == ("fid_prefix", "ad_")
+    assert rules.match(fake_feed(1, fid="a")) is None
+    assert rules.match(fake_feed(1, summary=dict(summary="50% discount!"))) == (
+        "keyword",
+        "discount",
+    )
+    assert rules.match(fake_feed(1)) is None
+    assert rules.hits[("uin", 150)] == 1
+    assert sum(rules.hits.values()) == 5
+
+
+def test_rules_len(fake_feed):
+    assert len(DropRules(keywords=["a|b", "c"])) == 2
+    assert len(DropRules(keywords=[""])) == 0
+    # an empty keyword matches nothing
+    assert DropRules(keywords=[""]).match(fake_feed(1)) is None
+    # so does an empty fid prefix
+    assert len(DropRules(fid_prefixes=["", "ad"])) == 1
+    assert DropRules(fid_prefixes=[""]).match(fake_feed(1)) is None
+
+
+def test_default(fake_feed):
+    rules = DropRules.default()
+    assert rules.match(fake_feed(1, uin=20050606))
+    assert rules.match(fake_feed(1, fid="advertisement_1"))
+    assert not rules.match(fake_feed(1))
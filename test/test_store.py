@@ -0,0 +1,90 @@
+import pytest
+
+from aioqzone_feed.store import (
+    Checkpoint,
+    FileCheckpointStore,
+    FileSeenStore,
+    MemorySeenStore,
+    SeenStore,
+)
+
+
+def test_memory_seen_lru():
+    store = MemorySeenStore(maxsize=2)
+    store.add((1, 1))
+    store.add((1, 2))
+    assert (1, 1) in store
+    store.add((1, 3))
+    assert (1, 2) not in store
+    assert (1, 1) in store
+    assert len(store) == 2
+
+
+def test_file_seen_reload(tmp_path):
+    path = tmp_path / "seen.txt"
+    store = FileSeenStore(path)
+    store.add((1, 100))
+    store.add((2, 200))
+    store.set_watermark(0, 200)
+    store.set_watermark(0, 300)
+    store.close()
+
+    store = FileSeenStore(path)
+    assert (1, 100) in store
+    assert (2, 200) in store
+    assert (3, 300) not in store
+    assert store.watermark(0) == 300
+    assert store.watermark(1) == 0
+    store.close()
+    # compacted when loaded
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_file_checkpoint(tmp_path):
+    path = tmp_path / "cp.json"
+    store = FileCheckpointStore(path)
+    store.put("a", Checkpoint(uin=None, attach_info="x", cnt_got=10, abstime=100))
+    store.put("b", Checkpoint(uin=1, attach_info="y", cnt_got=20, abstime=200))
+    store.delete("b")
+
+    store = FileCheckpointStore(path)
+    assert store.get("a") == Checkpoint(uin=None, attach_info="x", cnt_got=10, abstime=100)
+    assert store.get("b") is None
+
+
+def test_file_seen_flush(tmp_path):
+    path = tmp_path / "seen.txt"
+    with FileSeenStore(path, flush_every=2) as store:
+        store.add((1, 100))
+        assert not path.read_text()
+        # flushed without closing, so a crash keeps the marks
+        store.add((1, 101))
+        assert len(path.read_text().splitlines()) == 2
+        store.set_watermark(0, 101)
+        assert len(path.read_text().splitlines()) == 3
+    assert store._f.closed
+
+
+def test_file_seen_compact(tmp_path):
+    path = tmp_path / "seen.txt"
+    with FileSeenStore(path, maxsize=4, flush_every=1) as store:
+        for i in range(20):
+            store.add((1, i))
+            store.set_watermark(0, i)
+            # the compacted 5 lines, plus at most twice maxsize appended lines
+            assert len(path.read_text().splitlines()) <= 5 + 2 * 4
+        assert store.watermark(0) == 19
+
+    store = FileSeenStore(path, maxsize=4)
+    assert [(1, i) in store for i in range(15, 20)] == [False] + [True] * 4
+    assert store.watermark(0) == 19
+    store.close()
+
+
+def test_abstract_store():
+    class Partial(SeenStore):
+        def __contains__(self, key):
+            return False
+
+    with pytest.raises(TypeError):
+        Partial()  # type: ignore
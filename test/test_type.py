@@ -0,0 +1,139 @@
+import copy
+import pickle
+import weakref
+from unittest.mock import patch
+
+import pytest
+from aioqzone.model import FeedData, ProfileFeedData
+from pydantic import ValidationError
+
+from aioqzone_feed.type import BaseFeed, FeedContent, LazyFeedContent, VisualMedia
+
+
+def feed(abstime: int, uin: int = 1, **kwds):
+    return FeedContent(
+        appid=311, typeid=0, fid="f", abstime=abstime, uin=uin, nickname="n", **kwds
+    )
+
+
+def test_slots():
+    media = VisualMedia(height=1, width=1, raw="r", is_video=False)
+    for o in [media, feed(1, media=[media]), BaseFeed(311, 0, "f", 1, 1, "n")]:
+        assert not hasattr(o, "__dict__")
+        assert pickle.loads(pickle.dumps(o)) == o
+        assert copy.deepcopy(o) == o
+        assert weakref.ref(o)() is o
+
+
+def test_hash_order():
+    assert hash(BaseFeed(311, 0, "f", 1, 2, "n")) == hash((2, 1))
+    assert feed(1) < feed(2) <= feed(2)
+    assert feed(1, uin=1) < feed(1, uin=2)
+    assert hash(feed(1)) == hash(feed(1))
+    assert sorted([feed(3), feed(1), feed(2)]) == [feed(1), feed(2), feed(3)]
+
+
+def test_lazy(fake_feed):
+    raw = fake_feed(100, pic=None, original=None)
+    eager = FeedContent.from_feed(raw)
+    eager.set_detail(raw)
+
+    lazy = LazyFeedContent.from_feed(raw)
+    lazy.set_detail(raw)
+    assert lazy.uin == eager.uin and lazy.abstime == eager.abstime
+    assert lazy._raw is raw
+    assert lazy.entities == eager.entities
+    assert lazy._raw is None
+    assert lazy == eager
+    assert hash(lazy) == hash(eager)
+
+
+def raw_feed(abstime: int, uin: int = 1, **kwds):
+    fid = f"{uin:x}{abstime:x}".rjust(24, "0")
+    url = f"http://user.qzone.qq.com/{uin}/mood/{fid}"
+    comm = dict(
+        time=abstime,
+        appid=311,
+        feedstype=0,
+        curlikekey=url,
+        orglikekey=url,
+        ugckey="",
+        ugcrightkey=fid,
+        right_info={},
+        wup_feeds_type=0,
+    )
+    return dict(
+        id=dict(cellid=fid),
+        comm=comm,
+        userinfo=dict(user=dict(uin=uin, nickname=f"user{uin}")),
+        summary=dict(summary=f"@{{uin:2,nick:two}} feed at {abstime} [em]e100[/em]"),
+        like=dict(isliked=1, num=3),
+        **kwds,
+    )
+
+
+def photo(key: str):
+    return {
+        str(i): dict(height=h, width=w, url=f"http://photo.qzone.qq.com/{key}_{i}.jpg")
+        for i, (h, w) in enumerate([(360, 640), (1080, 1920), (180, 320)])
+    }
+
+
+def video(key: str):
+    return dict(
+        videoid=key,
+        videourl=f"http://video.qzone.qq.com/{key}.mp4",
+        coverurl=photo(key),
+        videotime=1,
+    )
+
+
+def picdata(key: str, is_video=False):
+    return dict(
+        photourl=photo(key),
+        videodata=(
+            video(key) if is_video else dict(videoid="", videourl="", coverurl={}, videotime=0)
+        ),
+        albumid="a",
+        curlikekey=key,
+        origin_size=1,
+        origin_height=1080,
+        origin_width=1920,
+    )
+
+
+def converted(raw: dict, profile=False):
+    model = (ProfileFeedData if profile else FeedData).model_validate(raw)
+    feed = FeedContent.from_feed(model)
+    feed.set_detail(model)
+    return feed
+
+
+def test_from_raw():
+    origin = raw_feed(90, 2, pic=dict(albumid="a", uin=2, picdata=[picdata("o")]))
+    origin = {f"cell_{k}": v for k, v in origin.items()}
+    origin["cell_summary"]["summary"] = "：" + origin["cell_summary"]["summary"]
+    share = dict(cell_comm=dict(raw_feed(80)["comm"], orglikekey="not a url"))
+    raws = [
+        raw_feed(100),
+        raw_feed(101, pic=dict(albumid="a", uin=1, picdata=[picdata("p"), picdata("v", True)])),
+        raw_feed(102, video=video("t")),
+        raw_feed(103, original=origin),
+        raw_feed(104, original=share),
+    ]
+    for raw in raws:
+        expected = converted(raw)
+        with patch.object(FeedData, "model_validate", side_effect=AssertionError):
+            # the fast path does not validate
+            assert FeedContent.from_raw(raw) == expected
+
+    pics = [dict(photourl=photo("q"), commentcount=0)]
+    profile = raw_feed(105, pic=dict(albumid="a", uin=1, picdata=dict(pic=pics)))
+    assert FeedContent.from_raw(profile, profile=True) == converted(profile, profile=True)
+
+
+def test_from_raw_invalid():
+    raw = raw_feed(100)
+    raw["comm"]["time"] = "not a time"
+    with pytest.raises(ValidationError):
+        FeedContent.from_raw(raw)